@@ -2,25 +2,68 @@
 """
 SonarCloud Issues
 Usage: uv run main.py
+       uv run main.py watch [--branch NAME] [--port 8765]
 """
 
+import argparse
+import asyncio
 import base64
+import bisect
+import collections
+import contextlib
+import cProfile
+import dataclasses
+import functools
+import gc
+import hashlib
+import heapq
+import importlib.util
 import json
+import math
+import mmap
+import multiprocessing
 import os
+import pstats
+import random
+import re
 import shutil
+import statistics
 import sys
 import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
+import numpy as np
 import pandas as pd
 import requests
 
+try:
+    import httpx  # 可选：安装后启用异步连接复用与HTTP/2
+except ImportError:
+    httpx = None
+
+try:
+    import bsdiff4  # 可选：安装后支持增量更新
+except ImportError:
+    bsdiff4 = None
+
 # ==================== 配置文件路径 ====================
 CONFIG_FILE = ".sonarcloud_config.json"
 # API端点
 API_URL = "https://sonarcloud.io/api/issues/search"
 # 输出文件名前缀
 OUTPUT_PREFIX = "sonarcloud_issues"
+# 热点排行输出文件名前缀
+HOTSPOT_PREFIX = "sonarcloud_hotspots"
+# release元数据缓存（ETag与获取时间）
+UPDATE_CACHE_FILE = ".sonarcloud_update_cache.json"
+# 上次导出记录（用于跳过内容未变化的导出）
+EXPORT_STATE_FILE = ".sonarcloud_export_state.json"
 # 当前版本
 CURRENT_VERSION = "0.1.0"
 # GitHub API URL
@@ -31,32 +74,289 @@ GITHUB_API_URL = (
 UPDATE_BASE_URL = (
     "https://github.com/Cola-Pig1121/sonarqube-cloud-issues/releases/download/{version}"
 )
+# 导出列（与fetch_all_issues生成的字段一致）
+ISSUE_COLUMNS = [
+    "Issue Key",
+    "类型",
+    "严重级别",
+    "状态",
+    "文件路径",
+    "行号",
+    "问题描述",
+    "创建时间",
+    "作者",
+    "规则",
+    "分支",
+    "PR编号",
+]
+# CSV导出使用的英文表头
+CSV_COLUMNS = [
+    "Issue Key",
+    "Type",
+    "Severity",
+    "Status",
+    "File Path",
+    "Line",
+    "Message",
+    "Created",
+    "Author",
+    "Rule",
+    "Branch",
+    "PR",
+]
+# 并行导出CSV时每个分片的最大行数
+PARALLEL_CHUNK_ROWS = 100000
+# Excel单个工作表的最大数据行数（不含表头）
+EXCEL_MAX_ROWS = 1048575
+# 严重级别（从高到低）
+SEVERITY_LEVELS = ["BLOCKER", "CRITICAL", "MAJOR", "MINOR", "INFO"]
+# 可重试的HTTP状态码
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
 # ====================================================
 
 
-def load_config():
-    """从配置文件加载配置"""
-    if os.path.exists(CONFIG_FILE):
+@dataclass
+class AppConfig:
+    """类型化的运行配置：连接信息 + 性能参数"""
+
+    sonar_token: str = ""
+    project_key: str = ""
+    organization: str = ""
+    branch: str = "main"
+    pr_number: str = ""
+    # 并发与分页
+    max_connections: int = 8
+    page_size: int = 500
+    export_workers: int = 0  # 0表示使用全部CPU核心
+    parallel_export_rows: int = 50000  # CSV超过该行数时多进程渲染
+    # Excel超过该行数时按此行数拆分为分卷（默认仅在超出单表上限时拆分）
+    excel_part_rows: int = EXCEL_MAX_ROWS
+    # 请求超时与重试策略
+    request_timeout: float = 30
+    max_retries: int = 3
+    retry_backoff: float = 1.0
+    # 自动更新：版本信息缓存时间（秒）与更新镜像地址
+    update_cache_ttl: int = 3600
+    update_mirror: str = ""
+    # 导出文件命名：timestamp / hash（内容哈希） / fixed（固定文件名）
+    output_naming: str = "timestamp"
+    # timestamp模式下内容未变化时的处理：write / skip / symlink
+    unchanged_action: str = "write"
+    # 元数据（不支持环境变量/命令行覆盖）
+    created_at: str = ""
+    updated_at: str = ""
+
+    def is_complete(self):
+        """连接SonarCloud所需的字段是否齐全"""
+        return bool(self.sonar_token and self.project_key and self.organization)
+
+
+# 取值受限的配置项
+CONFIG_CHOICES = {
+    "output_naming": ("timestamp", "hash", "fixed"),
+    "unchanged_action": ("write", "skip", "symlink"),
+}
+# 数值配置项的取值范围：(最小值, 最大值, 说明)，None表示不限
+CONFIG_RANGES = {
+    "max_connections": (1, None, "必须大于0"),
+    "page_size": (1, 500, "取值范围为1-500"),
+    "export_workers": (0, None, "不能为负数（0表示自动）"),
+    "parallel_export_rows": (1, None, "必须大于0"),
+    "excel_part_rows": (1, EXCEL_MAX_ROWS, f"取值范围为1-{EXCEL_MAX_ROWS}"),
+    "request_timeout": (0, None, "必须大于0"),
+    "max_retries": (0, None, "不能为负数"),
+    "retry_backoff": (0, None, "必须大于0"),
+    "update_cache_ttl": (0, None, "不能为负数"),
+}
+# 必须严格大于最小值的配置项
+CONFIG_POSITIVE_FIELDS = ("request_timeout", "retry_backoff")
+# 不参与环境变量/命令行覆盖的字段
+CONFIG_META_FIELDS = ("created_at", "updated_at")
+
+
+def config_env_name(name):
+    """配置字段对应的环境变量名，如 project_key → SONAR_PROJECT_KEY"""
+    return "SONAR_" + name.upper().removeprefix("SONAR_")
+
+
+def coerce_config_value(name, value):
+    """按AppConfig字段类型转换配置值，未知字段抛出ValueError"""
+    field_types = {f.name: f.type for f in dataclasses.fields(AppConfig)}
+    if name not in field_types:
+        raise ValueError(f"未知配置项: {name}")
+    value = field_types[name](value)
+    if name in CONFIG_CHOICES and value not in CONFIG_CHOICES[name]:
+        raise ValueError(f"{name} 可选值: {', '.join(CONFIG_CHOICES[name])}")
+    if name in CONFIG_RANGES:
+        minimum, maximum, hint = CONFIG_RANGES[name]
+        if (
+            value < minimum
+            or (name in CONFIG_POSITIVE_FIELDS and value == minimum)
+            or (maximum is not None and value > maximum)
+        ):
+            raise ValueError(f"{name} {hint}: {value}")
+    return value
+
+
+class ConfigStore:
+    """配置存储：配置文件只读取一次并缓存，写入采用原子替换
+
+    配置按 文件中的档案 < 环境变量(SONAR_*) < 命令行(--set) 的顺序合并；
+    覆盖值只作用于当前进程，不会被写回配置文件。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.profile = None  # None表示使用文件中的active_profile
+        self.cli_overrides = {}
+        self._document = None
+        self._config = None
+
+    def configure(self, profile=None, cli_overrides=None):
+        """设置命令行指定的档案与覆盖值（需在首次load之前调用）"""
+        self.profile = profile
+        self.cli_overrides = dict(cli_overrides or {})
+        self._config = None
+
+    def read_document(self):
+        """读取配置文件；兼容旧版单一配置的扁平格式（视为default档案）"""
+        if self._document is None:
+            document = {"active_profile": "default", "profiles": {}}
+            data = self._read_file()
+            if "profiles" in data:
+                document.update(data)
+            elif data:
+                document["profiles"]["default"] = data
+            self._document = document
+        return self._document
+
+    def _read_file(self):
+        """读取配置文件内容；文件损坏时移到 .bak 并视为空配置，以便重新保存"""
+        if not os.path.exists(self.path):
+            return {}
         try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                config = json.load(f)
-                # 确保新字段存在
-                if "branch" not in config:
-                    config["branch"] = "main"
-                if "pr_number" not in config:
-                    config["pr_number"] = ""
-                return config
-        except Exception as e:
-            print(f"读取配置文件失败: {e}")
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("顶层不是JSON对象")
+            return data
+        except ValueError as e:
+            backup = self.path + ".bak"
+            print(f"警告：配置文件已损坏({e})，已备份为 {backup}，将使用空配置")
+            try:
+                os.replace(self.path, backup)
+            except OSError as move_error:
+                print(f"警告：无法备份损坏的配置文件: {move_error}")
+            return {}
+
+    @property
+    def active_profile(self):
+        return self.profile or self.read_document().get("active_profile", "default")
+
+    def profiles(self):
+        return list(self.read_document()["profiles"])
+
+    def overrides(self):
+        """合并环境变量与命令行覆盖值"""
+        values = {}
+        for field in dataclasses.fields(AppConfig):
+            if field.name in CONFIG_META_FIELDS:
+                continue
+            env_value = os.environ.get(config_env_name(field.name))
+            if env_value:
+                values[field.name] = env_value
+        values.update(self.cli_overrides)
+        return values
+
+    def merged_values(self):
+        stored = self.read_document()["profiles"].get(self.active_profile)
+        overrides = self.overrides()
+        if stored is None and not overrides:
             return None
-    return None
+        values = {}
+        for name, value in (stored or {}).items():
+            try:
+                values[name] = coerce_config_value(name, value)
+            except ValueError as e:
+                # 兼容旧版或手工编辑的配置文件：跳过该字段并使用默认值
+                print(f"警告：忽略配置文件中的无效配置: {e}")
+        for name, value in overrides.items():
+            # 覆盖值由用户显式指定，无效时直接报错而不是静默回退
+            values[name] = coerce_config_value(name, value)
+        return values
+
+    def load(self):
+        """返回合并后的AppConfig；没有任何配置来源时返回None"""
+        if self._config is None:
+            values = self.merged_values()
+            if values is None:
+                return None
+            self._config = AppConfig(**values)
+        return self._config
+
+    def refresh(self):
+        """重新合并配置并原地更新缓存对象，使已持有该对象的调用方同步生效"""
+        values = self.merged_values()
+        if self._config is None or values is None:
+            self._config = None
+            return self.load()
+        for name, value in dataclasses.asdict(AppConfig(**values)).items():
+            setattr(self._config, name, value)
+        return self._config
+
+    def write_document(self):
+        data = json.dumps(self.read_document(), indent=2, ensure_ascii=False)
+        # 配置文件包含Token，仅属主可读写
+        atomic_write(self.path, data.encode("utf-8"), mode=0o600)
+
+    def save(self, values, replace=False):
+        """将values写入当前档案；replace=True时整体替换该档案"""
+        coerced = {
+            name: coerce_config_value(name, value) for name, value in values.items()
+        }
+        document = self.read_document()
+        profile = (
+            {} if replace else dict(document["profiles"].get(self.active_profile, {}))
+        )
+        profile.update(values)
+        document["profiles"][self.active_profile] = profile
+        self.write_document()
+        if self._config is None:
+            self.load()
+            return
+        if replace:
+            # 未保存的字段恢复为默认值（或覆盖值），与配置文件保持一致
+            self.refresh()
+        # 显式保存的值优先于本进程的覆盖值
+        for name, value in coerced.items():
+            setattr(self._config, name, value)
+
+    def switch_profile(self, name):
+        """切换当前档案并记录到配置文件"""
+        document = self.read_document()
+        document["active_profile"] = name
+        document["profiles"].setdefault(name, {})
+        self.profile = name
+        self.write_document()
+        return self.refresh()
+
+
+CONFIG_STORE = ConfigStore(CONFIG_FILE)
 
 
-def save_config(config):
-    """保存配置到文件"""
+def load_config():
+    """加载配置（首次调用时读取文件，之后返回缓存）"""
+    try:
+        return CONFIG_STORE.load()
+    except Exception as e:
+        print(f"读取配置文件失败: {e}")
+        return None
+
+
+def save_config(values, replace=False):
+    """保存配置到当前档案"""
     try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        CONFIG_STORE.save(values, replace=replace)
         print("配置已保存")
         return True
     except Exception as e:
@@ -117,28 +417,22 @@ def prompt_for_config():
 
 def set_branch():
     """单独设置分支"""
-    config = load_config() or {}
     try:
         print("提示：默认分支通常为 main 或 master")
         branch = input("请输入分支名称 [main]: ").strip()
         if not branch:
             branch = "main"
-        config["branch"] = branch
-        config["updated_at"] = datetime.now().isoformat()
-        save_config(config)
+        save_config({"branch": branch, "updated_at": datetime.now().isoformat()})
     except KeyboardInterrupt:
         print("\n取消操作")
 
 
 def set_pr_number():
     """单独设置PR编号"""
-    config = load_config() or {}
     try:
         print("提示：留空表示不导出PR")
         pr_number = input("请输入默认PR编号（留空清除）: ").strip()
-        config["pr_number"] = pr_number
-        config["updated_at"] = datetime.now().isoformat()
-        save_config(config)
+        save_config({"pr_number": pr_number, "updated_at": datetime.now().isoformat()})
     except KeyboardInterrupt:
         print("\n取消操作")
 
@@ -157,6 +451,7 @@ def show_settings_menu():
         print("(6) 查看当前配置")
         print("(7) 重新配置所有设置")
         print("(8) 检查更新")
+        print("(9) 切换配置档案")
         print("(0) 返回主菜单")
         print("=" * 60)
 
@@ -180,21 +475,22 @@ def show_settings_menu():
             reconfigure_all()
         elif choice == "8":
             check_for_updates()
+        elif choice == "9":
+            switch_profile()
         else:
             print("无效选项")
 
 
 def set_token():
     """单独设置Token"""
-    config = load_config() or {}
     try:
         print("错误：请设置SONAR_TOKEN为你的User Token")
         print("   获取方式：SonarCloud → My Account → Security → Generate Token")
         token = input("请输入新的User Token: ").strip()
         if token:
-            config["sonar_token"] = token
-            config["updated_at"] = datetime.now().isoformat()
-            save_config(config)
+            save_config(
+                {"sonar_token": token, "updated_at": datetime.now().isoformat()}
+            )
         else:
             print("Token不能为空")
     except KeyboardInterrupt:
@@ -203,15 +499,14 @@ def set_token():
 
 def set_project_key():
     """单独设置Project Key"""
-    config = load_config() or {}
     try:
         print("错误：请设置PROJECT_KEY和ORGANIZATION")
         print("   示例：PROJECT_KEY='org_pro'，ORGANIZATION='org'")
         project_key = input("请输入新的Project Key: ").strip()
         if project_key:
-            config["project_key"] = project_key
-            config["updated_at"] = datetime.now().isoformat()
-            save_config(config)
+            save_config(
+                {"project_key": project_key, "updated_at": datetime.now().isoformat()}
+            )
         else:
             print("Project Key不能为空")
     except KeyboardInterrupt:
@@ -220,15 +515,14 @@ def set_project_key():
 
 def set_organization():
     """单独设置Organization"""
-    config = load_config() or {}
     try:
         print("错误：请设置PROJECT_KEY和ORGANIZATION")
         print("   示例：PROJECT_KEY='org_pro'，ORGANIZATION='org'")
         organization = input("请输入新的Organization Key（小写）: ").strip().lower()
         if organization:
-            config["organization"] = organization
-            config["updated_at"] = datetime.now().isoformat()
-            save_config(config)
+            save_config(
+                {"organization": organization, "updated_at": datetime.now().isoformat()}
+            )
         else:
             print("Organization Key不能为空")
     except KeyboardInterrupt:
@@ -242,20 +536,41 @@ def view_config():
         print("\n当前未配置")
         return
 
+    overridden = CONFIG_STORE.overrides()
+
+    def mark(name):
+        return "（环境变量/命令行覆盖）" if name in overridden else ""
+
     print("\n" + "=" * 60)
     print("当前配置")
     print("=" * 60)
-    token_display = (
-        config.get("sonar_token", "")[:8] + "..."
-        if config.get("sonar_token")
-        else "未设置"
-    )
-    print(f"Token: {token_display}")
-    print(f"Project Key: {config.get('project_key', '未设置')}")
-    print(f"Organization: {config.get('organization', '未设置')}")
-    print(f"默认分支: {config.get('branch', 'main')}")
-    print(f"PR编号: {config.get('pr_number', '未设置')}")
-    print(f"创建时间: {config.get('created_at', '未知')}")
+    token_display = config.sonar_token[:8] + "..." if config.sonar_token else "未设置"
+    print(f"配置档案: {CONFIG_STORE.active_profile}")
+    print(f"Token: {token_display}{mark('sonar_token')}")
+    print(f"Project Key: {config.project_key or '未设置'}{mark('project_key')}")
+    print(f"Organization: {config.organization or '未设置'}{mark('organization')}")
+    print(f"默认分支: {config.branch}{mark('branch')}")
+    print(f"PR编号: {config.pr_number or '未设置'}{mark('pr_number')}")
+    print("-" * 60)
+    print(f"最大并发连接数: {config.max_connections}{mark('max_connections')}")
+    print(f"每页数量: {config.page_size}{mark('page_size')}")
+    workers = config.export_workers or f"自动({os.cpu_count()})"
+    print(f"导出进程数: {workers}{mark('export_workers')}")
+    print(
+        f"并行导出阈值: CSV {config.parallel_export_rows}行{mark('parallel_export_rows')}，"
+        f"Excel分卷 {config.excel_part_rows}行{mark('excel_part_rows')}"
+    )
+    print(f"请求超时: {config.request_timeout}秒{mark('request_timeout')}")
+    print(
+        f"失败重试: {config.max_retries}次，退避{config.retry_backoff}秒起"
+        f"{mark('max_retries') or mark('retry_backoff')}"
+    )
+    print(f"导出文件命名: {config.output_naming}{mark('output_naming')}")
+    print(f"内容未变化时: {config.unchanged_action}{mark('unchanged_action')}")
+    print(f"版本信息缓存: {config.update_cache_ttl}秒{mark('update_cache_ttl')}")
+    print(f"更新镜像: {config.update_mirror or '未设置'}{mark('update_mirror')}")
+    print("-" * 60)
+    print(f"创建时间: {config.created_at or '未知'}")
     print(f"当前版本: {CURRENT_VERSION}")
     print("=" * 60)
 
@@ -265,29 +580,57 @@ def reconfigure_all():
     print("\n重新配置所有设置...")
     config = prompt_for_config()
     if config:
-        save_config(config)
+        save_config(config, replace=True)
+
+
+def switch_profile():
+    """切换或新建配置档案"""
+    print(f"\n当前档案: {CONFIG_STORE.active_profile}")
+    print(f"已有档案: {', '.join(CONFIG_STORE.profiles()) or '无'}")
+    try:
+        name = input("请输入要切换的档案名称（不存在则新建）: ").strip()
+        if not name:
+            print("档案名称不能为空")
+            return
+        CONFIG_STORE.switch_profile(name)
+        print(f"已切换到档案: {name}")
+        if not load_config() or not load_config().is_complete():
+            print("提示：该档案尚未完成配置")
+            reconfigure_all()
+    except KeyboardInterrupt:
+        print("\n取消操作")
+    except Exception as e:
+        print(f"切换档案失败: {e}")
 
 
 def get_config_or_prompt():
     """获取配置，如果不存在则提示用户配置"""
     config = load_config()
-    if not config:
-        print("\n首次运行，需要进行配置")
-        config = prompt_for_config()
-        if config:
-            save_config(config)
-        else:
-            print("配置失败，程序退出")
-            sys.exit(1)
-    return config
+    if config and config.is_complete():
+        return config
+
+    if not sys.stdin.isatty():
+        # 非交互环境（如容器/CI）无法提示输入
+        print("错误：配置不完整，请通过配置文件、环境变量或 --set 提供以下配置:")
+        for name in ("sonar_token", "project_key", "organization"):
+            print(f"   {config_env_name(name)} / --set {name}=...")
+        sys.exit(1)
+
+    print("\n首次运行，需要进行配置")
+    values = prompt_for_config()
+    if not values:
+        print("配置失败，程序退出")
+        sys.exit(1)
+    save_config(values, replace=True)
+    return load_config() or AppConfig(**values)
 
 
 def select_scope(config):
-    """选择导出范围（分支/PR）"""
+    """选择导出范围（分支/PR），返回(branch, pr_number)；取消时返回None"""
     print("\n" + "=" * 60)
     print("选择导出范围")
     print("=" * 60)
-    print(f"(1) 默认分支: {config.get('branch', 'main')}")
+    print(f"(1) 默认分支: {config.branch}")
     print("(2) 指定分支")
     print("(3) Pull Request")
     print("(4) 所有分支汇总")
@@ -297,26 +640,26 @@ def select_scope(config):
     choice = input("请选择: ").strip()
 
     if choice == "0":
-        return None, None
+        return None
     elif choice == "1":
-        return config.get("branch", "main"), None
+        return config.branch, None
     elif choice == "2":
         branch = input("请输入分支名称: ").strip()
         if not branch:
             print("错误：分支名称不能为空")
-            return None, None
+            return None
         return branch, None
     elif choice == "3":
         pr_number = input("请输入PR编号: ").strip()
         if not pr_number:
             print("错误：PR编号不能为空")
-            return None, None
+            return None
         return None, pr_number
     elif choice == "4":
         return None, None  # 不传branch参数表示汇总
     else:
         print("无效选项")
-        return None, None
+        return None
 
 
 def select_severity_levels():
@@ -335,7 +678,7 @@ def select_severity_levels():
         return None  # 返回None表示不过滤，获取所有级别
 
     # 验证输入
-    valid_levels = ["BLOCKER", "CRITICAL", "MAJOR", "MINOR", "INFO"]
+    valid_levels = SEVERITY_LEVELS
     selected = [level.strip().upper() for level in choice.split(",")]
 
     # 过滤无效级别
@@ -390,139 +733,693 @@ def select_status():
     return ",".join(selected_statuses)
 
 
-def fetch_all_issues(
+def build_auth_headers(config):
+    """构建SonarCloud认证请求头（Token作为Basic认证用户名）"""
+    auth = base64.b64encode(f"{config.sonar_token}:".encode()).decode()
+    return {"Authorization": f"Basic {auth}"}
+
+
+def build_issue_params(
     config, branch=None, pr_number=None, severities=None, statuses="OPEN"
 ):
-    """获取issues，支持分支、PR、严重级别和状态过滤"""
-    auth = base64.b64encode(f"{config['sonar_token']}:".encode()).decode()
-    headers = {"Authorization": f"Basic {auth}"}
+    """构建issues/search的查询参数（不含分页参数）"""
+    params = {
+        "componentKeys": config.project_key,
+        "organization": config.organization,
+    }
 
-    all_issues = []
+    if statuses:
+        params["statuses"] = statuses  # 使用传入的状态参数，默认为OPEN
+
+    if severities:
+        params["severities"] = severities  # 添加严重级别过滤
+
+    if pr_number:
+        params["pullRequest"] = pr_number
+    elif branch:
+        params["branch"] = branch
+
+    return params
+
+
+class StageProfiler:
+    """按阶段采集性能数据（--profile）
+
+    每个阶段同时使用cProfile（确定性统计，输出pstats）和采样器（定时抓取调用栈，
+    输出可直接生成火焰图的collapsed stacks）。采样覆盖当前线程和sonar-http网络线程，
+    因此网络等待也能体现在栈中。未启用时stage()不做任何事。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.output_dir = None
+        self.interval = 0.005
+        self._profiles = {}
+        self._samples = {}
+        self._wall_time = {}
+        self._active = False
+
+    def enable(self, output_dir, interval=0.005):
+        self.enabled = True
+        self.output_dir = output_dir
+        self.interval = interval
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        # 嵌套阶段计入外层阶段（同一线程只能有一个活动的cProfile）
+        if not self.enabled or self._active:
+            yield
+            return
+
+        profile = self._profiles.setdefault(name, cProfile.Profile())
+        samples = self._samples.setdefault(name, collections.Counter())
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample,
+            args=(threading.get_ident(), samples, stop),
+            daemon=True,
+        )
+        self._active = True
+        started = time.perf_counter()
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            stop.set()
+            sampler.join()
+            self._wall_time[name] = (
+                self._wall_time.get(name, 0.0) + time.perf_counter() - started
+            )
+            self._active = False
+
+    def _sample(self, thread_id, samples, stop):
+        while not stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread in threading.enumerate():
+                if thread.ident != thread_id and not thread.name.startswith(
+                    "sonar-http"
+                ):
+                    continue
+                frame = frames.get(thread.ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                        f":{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                if stack:
+                    stack.append(thread.name)
+                    samples[";".join(reversed(stack))] += 1
+
+    def report(self, top=20):
+        """写出各阶段的pstats与collapsed stacks，并打印热点汇总"""
+        if not self.enabled or not self._profiles:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        lines = []
+        for name, profile in self._profiles.items():
+            profile.dump_stats(os.path.join(self.output_dir, f"{name}.pstats"))
+            collapsed = "".join(
+                f"{stack} {count}\n" for stack, count in self._samples[name].items()
+            )
+            atomic_write(
+                os.path.join(self.output_dir, f"{name}.collapsed"),
+                collapsed.encode("utf-8"),
+            )
+
+            stats = pstats.Stats(profile).stats
+            hotspots = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+            lines.append(
+                f"[{name}] 耗时 {self._wall_time[name]:.3f}秒，"
+                f"采样 {sum(self._samples[name].values())} 次"
+            )
+            lines.append(f"{'自身耗时':>10} {'累计耗时':>10} {'调用次数':>10}  函数")
+            for (filename, line, func), (_, calls, tottime, cumtime, _) in hotspots[
+                :top
+            ]:
+                location = f"{os.path.basename(filename)}:{line}" if line else filename
+                lines.append(
+                    f"{tottime:>10.4f} {cumtime:>10.4f} {calls:>10}  {func} ({location})"
+                )
+            lines.append("")
+
+        summary = "\n".join(lines)
+        atomic_write(
+            os.path.join(self.output_dir, "summary.txt"), summary.encode("utf-8")
+        )
+        print("\n" + "=" * 60)
+        print(f"性能热点汇总（前{top}项，按自身耗时排序）")
+        print("=" * 60)
+        print(summary)
+        print(f"性能数据已保存到: {os.path.abspath(self.output_dir)}")
+
+
+PROFILER = StageProfiler()
+
+
+class SonarApiError(Exception):
+    """SonarCloud API请求失败（消息可直接展示给用户）"""
+
+
+class AsyncSonarClient:
+    """基于asyncio的HTTP客户端核心
+
+    安装了httpx时使用httpx.AsyncClient，若同时安装了h2则启用HTTP/2，
+    多个页面/分支/项目请求复用少量连接；否则回退为requests会话加固定大小的线程池。
+    两种后端都用信号量限制同时在途的请求数，成百上千个逻辑查询也只占用少量连接和线程。
+    """
+
+    def __init__(self, max_connections=8, timeout=30, max_retries=0, retry_backoff=1.0):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.http2 = False
+        self.requests_sent = 0  # 实际发出的HTTP请求数（含重试）
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._client = None
+        self._session = None
+        self._executor = None
+
+    @classmethod
+    def from_config(cls, config):
+        """按配置中的并发、超时与重试参数创建客户端"""
+        if config is None:
+            return cls()
+        return cls(
+            max_connections=config.max_connections,
+            timeout=config.request_timeout,
+            max_retries=config.max_retries,
+            retry_backoff=config.retry_backoff,
+        )
+
+    async def __aenter__(self):
+        if httpx is not None:
+            self.http2 = importlib.util.find_spec("h2") is not None
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        else:
+            self._session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=self.max_connections,
+                pool_maxsize=self.max_connections,
+            )
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_connections, thread_name_prefix="sonar-http"
+            )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._client is not None:
+            await self._client.aclose()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._session.close()
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        """发送GET请求，返回带status_code/text/json()/headers的响应对象
+
+        连接错误、超时以及429/5xx响应按指数退避重试，429/503优先遵循Retry-After。
+        """
+        timeout = timeout or self.timeout
+        for attempt in range(self.max_retries + 1):
+            delay = self.retry_backoff * 2**attempt
+            try:
+                response = await self._send(url, params, headers, timeout)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    raise
+            else:
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                retry_after = response.headers.get("retry-after", "")
+                if retry_after.isdigit():
+                    delay = int(retry_after)
+            await asyncio.sleep(delay)
+
+    async def _send(self, url, params, headers, timeout):
+        async with self._semaphore:
+            self.requests_sent += 1
+            if self._client is not None:
+                return await self._client.get(
+                    url, params=params, headers=headers, timeout=timeout
+                )
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(
+                    self._session.get,
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=timeout,
+                ),
+            )
+
+    async def download(self, url, dest_path, on_progress=None, timeout=120):
+        """流式下载到dest_path，返回响应对象；非200时不写文件
+
+        on_progress(downloaded, total_size) 在每个数据块写入后调用。
+        """
+        async with self._semaphore:
+            self.requests_sent += 1
+            if self._client is not None:
+                async with self._client.stream("GET", url, timeout=timeout) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        return response
+                    total_size = int(response.headers.get("content-length", 0))
+                    downloaded = 0
+                    with open(dest_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(chunk_size=65536):
+                            f.write(chunk)
+                            downloaded += len(chunk)
+                            if on_progress:
+                                on_progress(downloaded, total_size)
+                    return response
+
+            # requests后端：在线程中下载，取消时通过事件通知线程尽快停止
+            cancelled = threading.Event()
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                self._executor,
+                self._download_blocking,
+                url,
+                dest_path,
+                on_progress,
+                timeout,
+                cancelled,
+            )
+            try:
+                return await future
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    def _download_blocking(self, url, dest_path, on_progress, timeout, cancelled):
+        response = self._session.get(url, stream=True, timeout=timeout)
+        try:
+            if response.status_code != 200:
+                response.content  # 关闭连接前读取错误响应内容
+                return response
+            total_size = int(response.headers.get("content-length", 0))
+            downloaded = 0
+            with open(dest_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    if cancelled.is_set():
+                        break
+                    if chunk:
+                        f.write(chunk)
+                        downloaded += len(chunk)
+                        if on_progress:
+                            on_progress(downloaded, total_size)
+            return response
+        finally:
+            response.close()
+
+
+def run_with_client(config, func, *args, **kwargs):
+    """同步外观：按配置创建AsyncSonarClient并运行 func(client, *args, **kwargs)
+
+    Ctrl+C时asyncio.run会先取消主任务（进而取消所有在途请求并关闭连接），
+    随后抛出KeyboardInterrupt，由调用方决定如何处理。
+    """
+
+    async def runner():
+        async with AsyncSonarClient.from_config(config) as client:
+            return await func(client, *args, **kwargs)
+
+    return asyncio.run(runner())
+
+
+def is_retryable_error(error):
+    """连接失败与超时可以重试"""
+    if isinstance(
+        error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    ):
+        return True
+    return httpx is not None and isinstance(error, httpx.TransportError)
+
+
+def is_timeout_error(error):
+    """判断异常是否为请求超时（兼容requests与httpx）"""
+    if isinstance(error, requests.exceptions.Timeout):
+        return True
+    return httpx is not None and isinstance(error, httpx.TimeoutException)
+
+
+def report_fetch_error(error):
+    """打印获取issues时的错误信息"""
+    if isinstance(error, SonarApiError):
+        print(error)
+    elif is_timeout_error(error):
+        print("请求超时，请检查网络")
+    else:
+        print(f"未知错误: {error}")
+
+
+def convert_issue(issue, branch=None, pr_number=None):
+    """将API返回的issue转换为导出记录"""
+    return {
+        "Issue Key": issue.get("key"),
+        "类型": issue.get("type"),
+        "严重级别": issue.get("severity"),
+        "状态": issue.get("status"),
+        "文件路径": issue.get("component", "").split(":")[-1],
+        "行号": issue.get("line", ""),
+        "问题描述": issue.get("message"),
+        "创建时间": issue.get("creationDate"),
+        "作者": issue.get("author", "N/A"),
+        "规则": issue.get("rule", "").split(":")[-1],
+        "分支": branch or "汇总",
+        "PR编号": pr_number or "N/A",
+    }
+
+
+async def fetch_issue_page(client, headers, params, page, page_size):
+    """获取单页issues，返回解析后的JSON"""
+    page_params = dict(params, ps=page_size, p=page)
+    response = await client.get(API_URL, params=page_params, headers=headers)
+    if response.status_code != 200:
+        raise SonarApiError(
+            f"HTTP错误: {response.status_code}\n响应: {response.text[:200]}"
+        )
+    try:
+        return response.json()
+    except ValueError:
+        raise SonarApiError(
+            f"响应解析失败，可能不是有效JSON\n原始响应: {response.text[:300]}"
+        )
+
+
+async def fetch_issues_async(
+    client,
+    config,
+    on_page,
+    branch=None,
+    pr_number=None,
+    severities=None,
+    statuses="OPEN",
+    page_size=None,
+    verbose=True,
+    window=None,
+):
+    """异步获取issues，返回API报告的总数
+
+    先获取第1页得到总数，再以滑动窗口并发获取其余页面；页面按顺序交给
+    on_page(rows) 处理，on_page返回True时取消剩余请求并提前结束。
+    window为同时预取的页数（默认为连接数的2倍），为1时逐页顺序获取，
+    提前结束不会多发请求。
+    """
+    page_size = page_size or config.page_size
+    headers = build_auth_headers(config)
+    params = build_issue_params(config, branch, pr_number, severities, statuses)
+
+    data = await fetch_issue_page(client, headers, params, 1, page_size)
+    total_from_api = data.get("total", 0)
+    if verbose:
+        print(f"API报告总issues数: {total_from_api}")
+        if total_from_api == 0:
+            print("警告：API返回0 issues，请检查配置")
+
+    pages = max(1, math.ceil(total_from_api / page_size))
+    window = window or client.max_connections * 2
+    pending = collections.deque()
+    next_page = 2
     page = 1
-    page_size = 500
+    total_fetched = 0
+
+    try:
+        while True:
+            issues = data.get("issues", [])
+            if not issues:
+                if verbose:
+                    print(f"第{page}页无数据，结束")
+                break
+
+            total_fetched += len(issues)
+            if verbose:
+                print(f"已加载第{page}页: {len(issues)}条 (累计: {total_fetched})")
+            rows = [convert_issue(issue, branch, pr_number) for issue in issues]
+            if on_page(rows) or len(issues) < page_size:
+                break
 
+            while next_page <= pages and len(pending) < window:
+                task = asyncio.ensure_future(
+                    fetch_issue_page(client, headers, params, next_page, page_size)
+                )
+                pending.append((next_page, task))
+                next_page += 1
+            if not pending:
+                break
+
+            page, task = pending.popleft()
+            data = await task
+    finally:
+        for _, task in pending:
+            task.cancel()
+        await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+    return total_from_api
+
+
+def fetch_all_issues(
+    config, branch=None, pr_number=None, severities=None, statuses="OPEN"
+):
+    """获取issues，支持分支、PR、严重级别和状态过滤（异步核心的同步外观）"""
     if pr_number:
         print(f"正在获取PR #{pr_number} 的issues")
     elif branch:
         print(f"正在获取分支 '{branch}' 的issues")
     else:
         print("正在获取所有分支汇总的issues")
-    print(f"项目: {config['project_key']}")
-    print(f"组织: {config['organization']}")
+    print(f"项目: {config.project_key}")
+    print(f"组织: {config.organization}")
     if severities:
         print(f"严重级别: {severities}")
     print(f"状态: {statuses}")
     print("=" * 50)
 
-    params = {
-        "componentKeys": config["project_key"],
-        "organization": config["organization"],
-        "ps": page_size,
-        "p": page,
-        "statuses": statuses,  # 使用传入的状态参数，默认为OPEN
-    }
+    all_issues = []
+    try:
+        with PROFILER.stage("fetch"):
+            run_with_client(
+                config,
+                fetch_issues_async,
+                config,
+                all_issues.extend,
+                branch,
+                pr_number,
+                severities,
+                statuses,
+            )
+    except Exception as e:
+        report_fetch_error(e)
+        return None
 
-    if severities:
-        params["severities"] = severities  # 添加严重级别过滤
+    return all_issues
 
-    if pr_number:
-        params["pullRequest"] = pr_number
-    elif branch:
-        params["branch"] = branch
 
-    total_fetched = 0
-    total_from_api = None
+def render_csv_bytes(issues, header=True):
+    """将issues渲染为CSV字节（英文表头）
+
+    header=False 用于并行导出的后续分片：不含表头和BOM，可直接按字节拼接。
+    """
+    df = pd.DataFrame(issues, columns=ISSUE_COLUMNS)
+    df.columns = CSV_COLUMNS
+    data = df.to_csv(index=False, header=header)
+    return data.encode("utf-8-sig" if header else "utf-8")
+
+
+def build_json_payload(issues, config):
+    """构建JSON导出内容（元数据 + issues）"""
+    return {
+        "metadata": {
+            "project": config.project_key,
+            "organization": config.organization,
+            "branch": config.branch,
+            "pr_number": config.pr_number,
+            "exported_at": datetime.now().isoformat(),
+            "total_issues": len(issues),
+            "version": CURRENT_VERSION,
+        },
+        "issues": issues,
+    }
 
-    while True:
+
+def default_file_mode(path):
+    """新文件应有的权限：沿用已有目标文件的权限，否则与普通open()一致（0666去掉umask）"""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write(path, data, mode=None):
+    """原子写入文件：先写同目录临时文件，再替换目标文件
+
+    mkstemp创建的临时文件权限为0600，替换前改为mode（默认见default_file_mode），
+    避免导出文件只有属主可读。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if mode is None:
+        mode = default_file_mode(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
         try:
-            response = requests.get(
-                API_URL,
-                headers=headers,
-                params=params,
-                timeout=30,
-            )
-            if response.status_code != 200:
-                print(f"HTTP错误: {response.status_code}")
-                print(f"响应: {response.text[:200]}")
-                return None
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
 
-            data = response.json()
 
-            if total_from_api is None:
-                total_from_api = data.get("total", 0)
-                print(f"API报告总issues数: {total_from_api}")
-                if total_from_api == 0:
-                    print("警告：API返回0 issues，请检查配置")
+def split_chunks(issues, workers):
+    """将issues按顺序切分为不超过PARALLEL_CHUNK_ROWS行的分片"""
+    chunk_rows = min(PARALLEL_CHUNK_ROWS, math.ceil(len(issues) / workers))
+    return [
+        issues[start : start + chunk_rows]
+        for start in range(0, len(issues), chunk_rows)
+    ]
 
-            issues = data.get("issues", [])
 
-            if not issues:
-                print(f"第{page}页无数据，结束")
-                break
+def export_worker_count():
+    """并行导出的进程数：配置的export_workers，未配置时为CPU核心数"""
+    config = load_config()
+    return (config and config.export_workers) or os.cpu_count() or 1
 
-            for issue in issues:
-                all_issues.append(
-                    {
-                        "Issue Key": issue.get("key"),
-                        "类型": issue.get("type"),
-                        "严重级别": issue.get("severity"),
-                        "状态": issue.get("status"),
-                        "文件路径": issue.get("component", "").split(":")[-1],
-                        "行号": issue.get("line", ""),
-                        "问题描述": issue.get("message"),
-                        "创建时间": issue.get("creationDate"),
-                        "作者": issue.get("author", "N/A"),
-                        "规则": issue.get("rule", "").split(":")[-1],
-                        "分支": branch or "汇总",
-                        "PR编号": pr_number or "N/A",
-                    }
-                )
 
-            total_fetched += len(issues)
-            print(f"已加载第{page}页: {len(issues)}条 (累计: {total_fetched})")
+def use_parallel_export(issues):
+    """CSV数据量足够大且有多核可用时才值得启动进程池"""
+    config = load_config() or AppConfig()
+    return len(issues) >= config.parallel_export_rows and export_worker_count() > 1
 
-            if len(issues) < page_size:
-                break
 
-            page += 1
-            params["p"] = page
+def excel_part_count(issues):
+    """Excel分卷数：只取决于行数与excel_part_rows，与机器的CPU核心数无关"""
+    config = load_config() or AppConfig()
+    return max(1, math.ceil(len(issues) / config.excel_part_rows))
 
-        except requests.exceptions.JSONDecodeError:
-            print("响应解析失败，可能不是有效JSON")
-            print(f"原始响应: {response.text[:300]}")
-            return None
-        except requests.exceptions.Timeout:
-            print("请求超时，请检查网络")
-            return None
-        except Exception as e:
-            print(f"未知错误: {e}")
-            return None
 
-    return all_issues
+def create_process_pool(tasks=None):
+    """创建导出用进程池（统一使用spawn，避免在持有线程的进程中fork）"""
+    workers = export_worker_count()
+    return ProcessPoolExecutor(
+        max_workers=min(workers, tasks) if tasks else workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
 
 
-def export_to_excel(issues, filename):
-    """导出为Excel格式"""
-    try:
-        df = pd.DataFrame(issues)
-
-        column_order = [
-            "Issue Key",
-            "类型",
-            "严重级别",
-            "状态",
-            "文件路径",
-            "行号",
-            "问题描述",
-            "创建时间",
-            "作者",
-            "规则",
-            "分支",
-            "PR编号",
-        ]
-        df = df[column_order]
+def write_excel_part(issues, filename):
+    """写入单个Excel分卷（在子进程中执行），返回行数"""
+    pd.DataFrame(issues, columns=ISSUE_COLUMNS).to_excel(
+        filename, index=False, engine="openpyxl"
+    )
+    return len(issues)
+
+
+def remove_stale_excel_parts(filename, keep=()):
+    """删除与filename同名的旧Excel分卷（不在keep中的 <名称>_partNNN.xlsx）
+
+    fixed命名模式下同名导出会反复覆盖，分卷数减少或改为单文件导出时，
+    多余的旧分卷不再出现在清单中，需要一并清理。
+    """
+    stem, ext = os.path.splitext(filename)
+    directory = os.path.dirname(os.path.abspath(filename))
+    pattern = re.compile(
+        re.escape(os.path.basename(stem)) + r"_part\d{3}" + re.escape(ext)
+    )
+    keep = {os.path.basename(name) for name in keep}
+    for name in os.listdir(directory):
+        if pattern.fullmatch(name) and name not in keep:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError as e:
+                print(f"    警告：无法删除旧分卷 {name}: {e}")
+
+
+def export_to_excel_parallel(issues, filename):
+    """多进程导出Excel：按excel_part_rows拆分为多个分卷工作簿并行生成，最后写入清单文件
+
+    分卷按固定行数切分，相同数据在任何机器上都得到相同的分卷布局。
+    """
+    stem, ext = os.path.splitext(filename)
+    part_rows = (load_config() or AppConfig()).excel_part_rows
+    chunks = [
+        issues[start : start + part_rows] for start in range(0, len(issues), part_rows)
+    ]
+    part_names = [f"{stem}_part{index:03d}{ext}" for index in range(1, len(chunks) + 1)]
+
+    with create_process_pool(len(chunks)) as pool:
+        row_counts = list(pool.map(write_excel_part, chunks, part_names))
+
+    manifest = {
+        "source": os.path.basename(filename),
+        "total_issues": len(issues),
+        "parts": [
+            {"file": os.path.basename(name), "rows": rows}
+            for name, rows in zip(part_names, row_counts)
+        ],
+        "created_at": datetime.now().isoformat(),
+    }
+    manifest_name = f"{stem}_manifest.json"
+    atomic_write(
+        manifest_name,
+        json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+    )
+    print(f"    已拆分为 {len(part_names)} 个分卷，清单: {manifest_name}")
+    remove_stale_excel_parts(filename, keep=part_names)
+    if os.path.isfile(filename):
+        os.remove(filename)  # 上次的单文件导出已被分卷取代
+
+
+def export_to_csv_parallel(issues, filename):
+    """多进程导出CSV：各分片并行渲染，按顺序逐字节拼接为一个文件"""
+    chunks = split_chunks(issues, export_worker_count())
+    headers = [index == 0 for index in range(len(chunks))]
+
+    with create_process_pool() as pool, open(filename, "wb") as f:
+        # map按提交顺序返回结果，保证分片按原顺序写入
+        for data in pool.map(render_csv_bytes, chunks, headers):
+            f.write(data)
 
+
+def export_to_excel(issues, filename, parallel=True):
+    """导出为Excel格式（超过excel_part_rows行时多进程生成分卷）"""
+    try:
+        if parallel and excel_part_count(issues) > 1:
+            export_to_excel_parallel(issues, filename)
+            return True
+        df = pd.DataFrame(issues, columns=ISSUE_COLUMNS)
         df.to_excel(filename, index=False, engine="openpyxl")
+        # 上次同名的分卷导出已被单文件取代
+        stem, _ = os.path.splitext(filename)
+        if os.path.exists(f"{stem}_manifest.json"):
+            os.remove(f"{stem}_manifest.json")
+            remove_stale_excel_parts(filename)
         return True
     except Exception as e:
         print(f"Excel导出失败: {e}")
@@ -530,26 +1427,13 @@ def export_to_excel(issues, filename):
 
 
 def export_to_csv(issues, filename):
-    """导出为CSV格式"""
-    try:
-        df = pd.DataFrame(issues)
-
-        df.columns = [
-            "Issue Key",
-            "Type",
-            "Severity",
-            "Status",
-            "File Path",
-            "Line",
-            "Message",
-            "Created",
-            "Author",
-            "Rule",
-            "Branch",
-            "PR",
-        ]
-
-        df.to_csv(filename, index=False, encoding="utf-8-sig")
+    """导出为CSV格式（大数据量时多进程渲染）"""
+    try:
+        if use_parallel_export(issues):
+            export_to_csv_parallel(issues, filename)
+            return True
+        with open(filename, "wb") as f:
+            f.write(render_csv_bytes(issues))
         return True
     except Exception as e:
         print(f"CSV导出失败: {e}")
@@ -559,27 +1443,226 @@ def export_to_csv(issues, filename):
 def export_to_json(issues, filename, config):
     """导出为JSON格式"""
     try:
-        output_data = {
-            "metadata": {
-                "project": config["project_key"],
-                "organization": config["organization"],
-                "branch": config.get("branch", "main"),
-                "pr_number": config.get("pr_number", ""),
-                "exported_at": datetime.now().isoformat(),
-                "total_issues": len(issues),
-                "version": CURRENT_VERSION,
-            },
-            "issues": issues,
-        }
-
         with open(filename, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
+            json.dump(
+                build_json_payload(issues, config), f, ensure_ascii=False, indent=2
+            )
         return True
     except Exception as e:
         print(f"JSON导出失败: {e}")
         return False
 
 
+# 本地快照格式：列式存储 + 内存映射读取
+# 布局：魔数(8字节) | 头部长度(uint32) | JSON头部 | 8字节对齐的列数据块
+SNAPSHOT_MAGIC = b"SCISNAP1"
+SNAPSHOT_SUFFIX = ".snap"
+# 字典编码列（取值种类少），存储为uint16编码 + 头部中的字典
+SNAPSHOT_DICT_COLUMNS = ["类型", "严重级别", "状态", "规则", "作者", "分支", "PR编号"]
+# 普通字符串列，存储为uint64偏移数组 + UTF-8数据块
+SNAPSHOT_STRING_COLUMNS = ["Issue Key", "文件路径", "行号", "问题描述", "创建时间"]
+
+
+def export_to_snapshot(issues, filename, config):
+    """导出为本地快照格式"""
+    try:
+        write_snapshot(issues, filename, build_json_payload(issues, config)["metadata"])
+        return True
+    except Exception as e:
+        print(f"快照导出失败: {e}")
+        return False
+
+
+def write_snapshot(issues, filename, metadata=None):
+    """将issues写入本地列式快照文件（原子替换）"""
+    blocks = []
+    offset = 0
+
+    def add_block(data):
+        nonlocal offset
+        start = offset
+        padding = (-len(data)) % 8
+        blocks.append(data + b"\0" * padding)
+        offset += len(data) + padding
+        return start, len(data)
+
+    columns = {}
+    for name in SNAPSHOT_DICT_COLUMNS:
+        values = [
+            "" if issue.get(name) is None else str(issue[name]) for issue in issues
+        ]
+        dictionary = sorted(set(values))
+        if len(dictionary) > 0xFFFF:
+            raise ValueError(f"列 {name} 取值过多，无法字典编码")
+        lookup = {value: code for code, value in enumerate(dictionary)}
+        codes = np.fromiter(
+            (lookup[v] for v in values), dtype=np.uint16, count=len(values)
+        )
+        start, length = add_block(codes.tobytes())
+        columns[name] = {
+            "kind": "dict",
+            "dictionary": dictionary,
+            "codes": [start, length],
+        }
+
+    for name in SNAPSHOT_STRING_COLUMNS:
+        encoded = [
+            b"" if issue.get(name) is None else str(issue[name]).encode("utf-8")
+            for issue in issues
+        ]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        columns[name] = {
+            "kind": "str",
+            "offsets": list(add_block(offsets.tobytes())),
+            "data": list(add_block(b"".join(encoded))),
+        }
+
+    # 文件路径排序索引：按路径（再按行号、Key）排序的行号数组，用于前缀查找
+    order = sorted(range(len(issues)), key=lambda i: issue_sort_key(issues[i]))
+    path_index = add_block(np.asarray(order, dtype=np.uint32).tobytes())
+
+    header = json.dumps(
+        {
+            "version": 1,
+            "rows": len(issues),
+            "columns": columns,
+            "path_index": list(path_index),
+            "metadata": metadata or {},
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+    prefix_len = len(SNAPSHOT_MAGIC) + 4 + len(header)
+    header += b" " * ((-prefix_len) % 8)  # 数据区从8字节边界开始
+
+    atomic_write(
+        filename,
+        SNAPSHOT_MAGIC + len(header).to_bytes(4, "little") + header + b"".join(blocks),
+    )
+
+
+class IssueSnapshot:
+    """以内存映射方式读取本地快照，筛选只在编码列和排序索引上进行"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load_header()
+        except (ValueError, KeyError, TypeError) as e:
+            self._codes = self._offsets = self._path_index = None
+            self._mmap.close()
+            raise ValueError(f"不是有效的快照文件: {filename} ({e})") from e
+
+    def _load_header(self):
+        magic_len = len(SNAPSHOT_MAGIC)
+        if self._mmap[:magic_len] != SNAPSHOT_MAGIC:
+            raise ValueError("文件头不匹配")
+        header_len = int.from_bytes(self._mmap[magic_len : magic_len + 4], "little")
+        header_start = magic_len + 4
+        header = json.loads(self._mmap[header_start : header_start + header_len])
+        self._base = header_start + header_len
+        self.rows = header["rows"]
+        self.metadata = header["metadata"]
+        self._columns = header["columns"]
+
+        # 以下均为mmap上的零拷贝视图
+        self._codes = {}
+        self._offsets = {}
+        self._data_start = {}
+        for name, column in self._columns.items():
+            if column["kind"] == "dict":
+                self._codes[name] = self._view(column["codes"], np.uint16)
+            else:
+                self._offsets[name] = self._view(column["offsets"], np.uint64)
+                self._data_start[name] = self._base + column["data"][0]
+        self._path_index = self._view(header["path_index"], np.uint32)
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        # 先释放所有numpy视图，mmap才能关闭
+        self._codes = self._offsets = self._path_index = None
+        self._mmap.close()
+
+    def _view(self, block, dtype):
+        start, length = block
+        return np.frombuffer(
+            self._mmap,
+            dtype=dtype,
+            count=length // np.dtype(dtype).itemsize,
+            offset=self._base + start,
+        )
+
+    def _string(self, name, row):
+        offsets = self._offsets[name]
+        start = self._data_start[name] + int(offsets[row])
+        end = self._data_start[name] + int(offsets[row + 1])
+        return self._mmap[start:end].decode("utf-8")
+
+    def values(self, name):
+        """返回字典编码列的所有取值"""
+        return list(self._columns[name]["dictionary"])
+
+    def filter(
+        self, severities=None, types=None, statuses=None, rules=None, path_prefix=None
+    ):
+        """按条件筛选，返回按文件路径排序的行号数组"""
+        selected = self._path_index
+        if path_prefix:
+            # 在路径排序索引上二分查找前缀区间
+            def path_at(position):
+                return self._string("文件路径", int(self._path_index[position]))
+
+            positions = range(self.rows)
+            low = bisect.bisect_left(positions, path_prefix, key=path_at)
+            high = bisect.bisect_right(
+                positions,
+                path_prefix,
+                key=lambda position: path_at(position)[: len(path_prefix)],
+            )
+            selected = selected[low:high]
+
+        for name, wanted in (
+            ("严重级别", severities),
+            ("类型", types),
+            ("状态", statuses),
+            ("规则", rules),
+        ):
+            if not wanted:
+                continue
+            allowed = [
+                code
+                for code, value in enumerate(self._columns[name]["dictionary"])
+                if value in wanted
+            ]
+            selected = selected[np.isin(self._codes[name][selected], allowed)]
+
+        return np.array(selected)  # 复制一份，避免调用方持有mmap视图
+
+    def rows_for(self, selected):
+        """批量读取行，恢复为与fetch_all_issues一致的记录格式"""
+        columns = {}
+        for name in ISSUE_COLUMNS:
+            if name in self._codes:
+                dictionary = self._columns[name]["dictionary"]
+                columns[name] = [dictionary[c] for c in self._codes[name][selected]]
+            else:
+                columns[name] = [self._string(name, int(row)) for row in selected]
+        columns["行号"] = [
+            int(line) if line.isdigit() else line for line in columns["行号"]
+        ]
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
 def show_export_menu(config):
     """显示导出格式选择菜单"""
     print("\n" + "=" * 60)
@@ -615,17 +1698,98 @@ def show_export_menu(config):
         print("请重新选择")
 
 
-def get_latest_version():
-    """从GitHub API获取最新版本号"""
+def load_update_cache():
+    """读取release元数据缓存"""
     try:
-        print("提示：正在查询最新版本...")
-        response = requests.get(GITHUB_API_URL, timeout=10)
-        if response.status_code != 200:
-            print(f"警告：无法获取最新版本信息 (HTTP {response.status_code})")
+        with open(UPDATE_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def release_metadata_url(config):
+    """release元数据地址：设置了更新镜像时为 <镜像>/latest.json"""
+    if config.update_mirror:
+        return f"{config.update_mirror.rstrip('/')}/latest.json"
+    return GITHUB_API_URL
+
+
+def release_asset_url(config, release, tag, name):
+    """release附件的下载地址：镜像 > release中的browser_download_url > 默认地址"""
+    if config.update_mirror:
+        return f"{config.update_mirror.rstrip('/')}/{tag}/{name}"
+    for asset in release.get("assets", []):
+        if asset.get("name") == name and asset.get("browser_download_url"):
+            return asset["browser_download_url"]
+    return f"{UPDATE_BASE_URL.format(version=tag)}/{name}"
+
+
+def get_latest_release(config, use_cache=True):
+    """获取最新release元数据（带ETag/TTL缓存），失败返回None
+
+    缓存未过期时不发请求；过期后带If-None-Match发送条件请求，304时沿用缓存。
+    """
+    url = release_metadata_url(config)
+    cache = load_update_cache() if use_cache else {}
+    if cache.get("url") != url:
+        cache = {}
+
+    if cache and time.time() - cache.get("fetched_at", 0) < config.update_cache_ttl:
+        print("提示：使用缓存的版本信息")
+        return cache["release"]
+
+    print("提示：正在查询最新版本...")
+    headers = {"If-None-Match": cache["etag"]} if cache.get("etag") else None
+    response = run_with_client(
+        config, lambda client: client.get(url, headers=headers, timeout=10)
+    )
+    if response.status_code == 304 and cache:
+        release = cache["release"]
+    elif response.status_code != 200:
+        print(f"警告：无法获取最新版本信息 (HTTP {response.status_code})")
+        return None
+    else:
+        data = response.json()
+        # 只缓存更新所需的字段
+        release = {
+            "tag_name": data.get("tag_name", ""),
+            "assets": [
+                {
+                    key: asset.get(key)
+                    for key in ("name", "browser_download_url", "digest", "size")
+                }
+                for asset in data.get("assets", [])
+            ],
+        }
+
+    if use_cache:
+        try:
+            atomic_write(
+                UPDATE_CACHE_FILE,
+                json.dumps(
+                    {
+                        "url": url,
+                        "etag": response.headers.get("etag") or cache.get("etag"),
+                        "fetched_at": time.time(),
+                        "release": release,
+                    },
+                    ensure_ascii=False,
+                    indent=2,
+                ).encode("utf-8"),
+            )
+        except OSError as e:
+            print(f"警告：无法写入版本信息缓存: {e}")
+    return release
+
+
+def get_latest_version(config, use_cache=True):
+    """获取最新版本号"""
+    try:
+        release = get_latest_release(config, use_cache)
+        if release is None:
             return None
 
-        data = response.json()
-        tag_name = data.get("tag_name", "")
+        tag_name = release.get("tag_name", "")
 
         if not tag_name:
             print("警告：响应中没有tag_name字段")
@@ -639,6 +1803,132 @@ def get_latest_version():
         return None
 
 
+def file_sha256(path):
+    """分块计算文件的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def expected_sha256(config, release, tag, name):
+    """获取附件的期望SHA-256：优先使用release中的digest，其次下载 <附件>.sha256"""
+    for asset in release.get("assets", []):
+        digest = asset.get("digest") or ""
+        if asset.get("name") == name and digest.startswith("sha256:"):
+            return digest.split(":", 1)[1].lower()
+
+    url = release_asset_url(config, release, tag, name + ".sha256")
+    try:
+        response = run_with_client(config, lambda client: client.get(url, timeout=10))
+    except Exception:
+        return None
+    if response.status_code != 200:
+        return None
+    value = response.text.strip().split()
+    if value and re.fullmatch(r"[0-9a-fA-F]{64}", value[0]):
+        return value[0].lower()
+    return None
+
+
+def apply_delta_update(config, release, tag, dest_path, expected):
+    """尝试用bsdiff增量补丁从当前程序生成新版本，成功返回True，否则需完整下载"""
+    if not getattr(sys, "frozen", False):
+        return False  # 源码运行时没有可打补丁的可执行文件
+    if bsdiff4 is None:
+        print("提示：未安装bsdiff4，跳过增量更新")
+        return False
+    if not expected:
+        print("提示：缺少新版本的SHA-256，无法校验增量结果，改为完整下载")
+        return False
+
+    patch_name = f"sonarcloud_issues-{CURRENT_VERSION}-to-{tag}-win.patch"
+    assets = release.get("assets")
+    if assets and patch_name not in {asset.get("name") for asset in assets}:
+        return False
+
+    patch_file = dest_path + ".patch"
+    print(f"提示：尝试增量更新: {patch_name}")
+    try:
+        if not download_file(
+            config, release_asset_url(config, release, tag, patch_name), patch_file
+        ):
+            return False
+        patch_expected = expected_sha256(config, release, tag, patch_name)
+        if patch_expected and file_sha256(patch_file) != patch_expected:
+            print("警告：增量补丁校验失败")
+            return False
+
+        with open(sys.executable, "rb") as f:
+            old_data = f.read()
+        with open(patch_file, "rb") as f:
+            new_data = bsdiff4.patch(old_data, f.read())
+        if hashlib.sha256(new_data).hexdigest() != expected:
+            print("警告：增量更新结果校验失败")
+            return False
+
+        with open(dest_path, "wb") as f:
+            f.write(new_data)
+        print(f"提示：增量更新成功（补丁 {os.path.getsize(patch_file)} bytes）")
+        return True
+    except Exception as e:
+        print(f"警告：增量更新失败: {e}")
+        return False
+    finally:
+        try:
+            os.remove(patch_file)
+        except OSError:
+            pass
+
+
+def download_release(config, release, tag, dest_path):
+    """下载新版本到dest_path：优先增量更新，失败时完整下载，并校验SHA-256
+
+    成功返回True；失败时删除dest_path并返回False。
+    """
+    exe_name = f"sonarcloud_issues-{tag}-win.exe"
+    expected = expected_sha256(config, release, tag, exe_name)
+    if not expected:
+        print("警告：未找到新版本的SHA-256，将跳过完整性校验")
+
+    if not apply_delta_update(config, release, tag, dest_path, expected):
+        download_url = release_asset_url(config, release, tag, exe_name)
+        print(f"提示：下载地址: {download_url}")
+        print(f"提示：文件大小可能较大，请耐心等待...")
+
+        print("\n提示：开始下载...")
+
+        # 执行下载
+        try:
+            downloaded = download_file(config, download_url, dest_path)
+        except KeyboardInterrupt:
+            print("\n提示：已取消下载")
+            downloaded = False
+        if not downloaded:
+            print("错误：下载失败")
+            try:
+                os.remove(dest_path)
+            except OSError:
+                pass
+            return False
+
+    # 验证文件
+    if not os.path.exists(dest_path) or os.path.getsize(dest_path) == 0:
+        print("错误：下载文件无效或为空")
+        try:
+            os.remove(dest_path)
+        except:
+            pass
+        return False
+
+    if expected and file_sha256(dest_path) != expected:
+        print("错误：文件SHA-256校验失败，已放弃更新")
+        os.remove(dest_path)
+        return False
+    return True
+
+
 def check_for_updates():
     """检查并下载更新"""
     print("\n" + "=" * 60)
@@ -646,7 +1936,8 @@ def check_for_updates():
     print("=" * 60)
 
     # 获取最新版本
-    latest_tag = get_latest_version()
+    config = load_config() or AppConfig()
+    latest_tag = get_latest_version(config)
     if not latest_tag:
         print("提示：无法获取最新版本信息")
         return False
@@ -669,30 +1960,12 @@ def check_for_updates():
         print("提示：取消更新")
         return False
 
-    # 构建下载URL
-    download_url = f"{UPDATE_BASE_URL.format(version=latest_tag)}/sonarcloud_issues-{latest_tag}-win.exe"
-    print(f"提示：下载地址: {download_url}")
-    print(f"提示：文件大小可能较大，请耐心等待...")
-
     # 临时文件路径
+    release = get_latest_release(config) or {}
     temp_file = os.path.join(
         tempfile.gettempdir(), f"sonarcloud_issues_{latest_tag}.exe"
     )
-
-    print("\n提示：开始下载...")
-
-    # 执行下载
-    if not download_file(download_url, temp_file):
-        print("错误：下载失败")
-        return False
-
-    # 验证文件
-    if not os.path.exists(temp_file) or os.path.getsize(temp_file) == 0:
-        print("错误：下载文件无效或为空")
-        try:
-            os.remove(temp_file)
-        except:
-            pass
+    if not download_release(config, release, latest_tag, temp_file):
         return False
 
     # 获取当前exe路径
@@ -745,10 +2018,21 @@ def check_for_updates():
     return True
 
 
-def download_file(url, dest_path):
+def download_file(config, url, dest_path):
     """下载文件并显示进度"""
+
+    def show_progress(downloaded, total_size):
+        if total_size > 0:
+            percent = (downloaded / total_size) * 100
+            print(
+                f"\r提示：下载进度 {percent:.1f}% ({downloaded}/{total_size} bytes)",
+                end="",
+            )
+
     try:
-        response = requests.get(url, stream=True, timeout=120)  # 增加超时时间
+        response = run_with_client(
+            config, lambda client: client.download(url, dest_path, show_progress)
+        )
         if response.status_code != 200:
             print(f"错误：HTTP {response.status_code}")
             if response.status_code == 404:
@@ -756,32 +2040,1406 @@ def download_file(url, dest_path):
             print(f"响应: {response.text[:200] if response.text else '无响应内容'}")
             return False
 
-        total_size = int(response.headers.get("content-length", 0))
-        downloaded = 0
-
-        with open(dest_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-
-                    # 显示进度
-                    if total_size > 0:
-                        percent = (downloaded / total_size) * 100
-                        print(
-                            f"\r提示：下载进度 {percent:.1f}% ({downloaded}/{total_size} bytes)",
-                            end="",
-                        )
-
         print()  # 换行
         return True
 
-    except requests.exceptions.Timeout:
-        print("\n错误：请求超时，请检查网络或稍后重试")
+    except Exception as e:
+        if is_timeout_error(e):
+            print("\n错误：请求超时，请检查网络或稍后重试")
+        else:
+            print(f"\n错误：下载失败: {e}")
         return False
+
+
+async def probe_issue_changes(
+    client, config, branch=None, pr_number=None, severities=None
+):
+    """轻量探测：仅请求1条按更新时间倒序的issue，返回变更指纹
+
+    不带状态过滤，这样issue被关闭/重开时也会刷新updateDate并体现在指纹中。
+    返回None表示探测失败。
+    """
+    params = build_issue_params(config, branch, pr_number, severities, statuses=None)
+    params.update({"s": "UPDATE_DATE", "asc": "false"})
+    try:
+        data = await fetch_issue_page(
+            client, build_auth_headers(config), params, 1, page_size=1
+        )
     except Exception as e:
-        print(f"\n错误：下载失败: {e}")
+        print(f"警告：变更探测失败: {e}")
+        return None
+
+    issues = data.get("issues", [])
+    latest_update = issues[0].get("updateDate", "") if issues else ""
+    return f"{data.get('total', 0)}|{latest_update}"
+
+
+def parse_sonar_date(value):
+    """解析SonarCloud的时间字符串（如 2025-01-02T00:00:00+0000）"""
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+
+
+def matches_issue_filter(row, severities=None, statuses=None):
+    """导出记录是否仍满足严重级别与状态过滤条件"""
+    if statuses and row["状态"] not in statuses.split(","):
         return False
+    return not severities or row["严重级别"] in severities.split(",")
+
+
+async def fetch_issue_updates(client, config, branch, pr_number, since):
+    """按更新时间倒序分页，获取updateDate不早于since的issues（不带过滤条件）
+
+    不带状态/严重级别过滤，这样被关闭或改级的issue也能取到并从已有结果中移除。
+    时间只精确到秒，探测之后同一秒内的更新不会改变指纹，因此since这一秒总是重新读取，
+    按Issue Key合并时重复记录没有副作用。
+    超出API分页上限时返回None，由调用方改为完整获取。
+    """
+    headers = build_auth_headers(config)
+    params = build_issue_params(config, branch, pr_number, statuses=None)
+    params.update({"s": "UPDATE_DATE", "asc": "false"})
+    since = parse_sonar_date(since)
+    updates = []
+    page = 1
+    while True:
+        if page * config.page_size > 10000:
+            return None  # issues/search最多返回前10000条
+        data = await fetch_issue_page(client, headers, params, page, config.page_size)
+        issues = data.get("issues", [])
+        for issue in issues:
+            if parse_sonar_date(issue["updateDate"]) < since:
+                return updates
+            updates.append(convert_issue(issue, branch, pr_number))
+        if len(issues) < config.page_size:
+            return updates
+        page += 1
+
+
+async def count_issues(client, config, branch, pr_number, severities, statuses):
+    """只请求1条记录，返回满足过滤条件的issues总数"""
+    params = build_issue_params(config, branch, pr_number, severities, statuses)
+    data = await fetch_issue_page(
+        client, build_auth_headers(config), params, 1, page_size=1
+    )
+    return data.get("total", 0)
+
+
+async def refresh_targets(client, config, targets, state, args):
+    """并发探测所有到期目标，再并发更新发生变化的目标
+
+    已有数据的目标只获取上次探测以来更新过的issues，按Issue Key合并到已有结果中；
+    合并后数量与API报告的总数不一致（或无法增量获取）时才完整重新获取。
+    返回 {目标名: (新指纹, 是否变化, {Issue Key: 记录}或None)}。
+    """
+    new_fingerprints = await asyncio.gather(
+        *(
+            probe_issue_changes(client, config, branch, pr_number, args.severities)
+            for _, branch, pr_number in targets
+        )
+    )
+
+    async def fetch_full(branch, pr_number):
+        issues = []
+        await fetch_issues_async(
+            client,
+            config,
+            issues.extend,
+            branch,
+            pr_number,
+            args.severities,
+            args.statuses,
+            verbose=False,
+        )
+        return {issue["Issue Key"]: issue for issue in issues}
+
+    async def fetch_incremental(name, branch, pr_number):
+        known = state[name]
+        updates = await fetch_issue_updates(
+            client, config, branch, pr_number, known["watermark"]
+        )
+        if updates is None:
+            return None
+        issues = dict(known["issues"])
+        for row in updates:
+            if matches_issue_filter(row, args.severities, args.statuses):
+                issues[row["Issue Key"]] = row
+            else:
+                issues.pop(row["Issue Key"], None)
+        total = await count_issues(
+            client, config, branch, pr_number, args.severities, args.statuses
+        )
+        if total != len(issues):
+            print(f"[{name}] 增量结果与总数不一致({len(issues)}/{total})，完整获取")
+            return None
+        print(f"[{name}] 增量获取: {len(updates)}条更新")
+        return issues
+
+    async def fetch_target(name, branch, pr_number, fingerprint):
+        try:
+            issues = None
+            if fingerprint is not None and state[name]["watermark"]:
+                issues = await fetch_incremental(name, branch, pr_number)
+            if issues is None:
+                issues = await fetch_full(branch, pr_number)
+        except Exception as e:
+            report_fetch_error(e)
+            return None
+        return issues
+
+    changed = [
+        fingerprint is None or fingerprint != state[name]["fingerprint"]
+        for (name, _, _), fingerprint in zip(targets, new_fingerprints)
+    ]
+    fetched = await asyncio.gather(
+        *(
+            fetch_target(name, branch, pr_number, fingerprint)
+            for (name, branch, pr_number), fingerprint, is_changed in zip(
+                targets, new_fingerprints, changed
+            )
+            if is_changed
+        )
+    )
+
+    results = {}
+    fetched_iter = iter(fetched)
+    for (name, _, _), fingerprint, is_changed in zip(
+        targets, new_fingerprints, changed
+    ):
+        issues = next(fetched_iter) if is_changed else None
+        results[name] = (fingerprint, is_changed, issues)
+    return results
+
+
+class SnapshotServer:
+    """监视模式下的快照存储，并通过本地HTTP端点提供最新快照"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self._default_target = None
+        self._httpd = None
+
+    def update(self, target, json_bytes, csv_bytes, total):
+        with self._lock:
+            self._snapshots[target] = {
+                "json": json_bytes,
+                "csv": csv_bytes,
+                "total": total,
+                "updated_at": datetime.now().isoformat(),
+            }
+            if self._default_target is None:
+                self._default_target = target
+
+    def get(self, target=None):
+        with self._lock:
+            return self._snapshots.get(target or self._default_target)
+
+    def status(self):
+        with self._lock:
+            return {
+                name: {"total": snap["total"], "updated_at": snap["updated_at"]}
+                for name, snap in self._snapshots.items()
+            }
+
+    def start(self, host, port):
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0].strip("/")
+                if path in ("", "status"):
+                    body = json.dumps(store.status(), ensure_ascii=False).encode()
+                    return self._reply(200, "application/json", body)
+
+                # 支持 /issues.json 与 /<target>/issues.json 两种形式
+                target, _, name = path.rpartition("/")
+                snapshot = store.get(target or None)
+                if name not in ("issues.json", "issues.csv"):
+                    return self._reply(404, "text/plain", b"not found")
+                if snapshot is None:
+                    return self._reply(503, "text/plain", b"snapshot not ready")
+                if name == "issues.json":
+                    return self._reply(200, "application/json", snapshot["json"])
+                return self._reply(200, "text/csv; charset=utf-8", snapshot["csv"])
+
+            def _reply(self, code, content_type, body):
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # 避免每次请求刷屏
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+
+def run_watch(config, args):
+    """监视模式：按自适应间隔轮询，数据变化时原子刷新导出文件与HTTP快照"""
+    targets = [(f"pr-{pr}", None, pr) for pr in args.pr or []]
+    targets += [(f"branch-{b}", b, None) for b in args.branch or []]
+    if args.all_branches:
+        targets.append(("all", None, None))
+    if not targets:
+        default_branch = config.branch
+        targets = [(f"branch-{default_branch}", default_branch, None)]
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+
+    server = SnapshotServer()
+    if args.port:
+        server.start(args.host, args.port)
+        print(f"提示：快照服务已启动: http://{args.host}:{args.port}/issues.json")
+
+    # watermark为上次成功获取时探测到的最新updateDate，issues为按Issue Key存放的当前结果
+    state = {
+        name: {
+            "interval": args.interval,
+            "next_poll": 0.0,
+            "fingerprint": None,
+            "watermark": None,
+            "issues": {},
+        }
+        for name, _, _ in targets
+    }
+
+    print(f"提示：监视 {len(targets)} 个目标，按 Ctrl+C 退出")
+    try:
+        while True:
+            now = time.monotonic()
+            due = [t for t in targets if now >= state[t[0]]["next_poll"]]
+            with PROFILER.stage("fetch"):
+                results = run_with_client(
+                    config,
+                    refresh_targets,
+                    config,
+                    due,
+                    state,
+                    args,
+                )
+            for name, (fingerprint, changed, issues) in results.items():
+                target_state = state[name]
+                if issues is not None:
+                    target_state["issues"] = issues
+                    # 指纹格式为 总数|最新updateDate，后者作为下次增量获取的起点
+                    target_state["watermark"] = (
+                        fingerprint and fingerprint.partition("|")[2]
+                    ) or None
+                    issues = sort_issues(issues.values())
+                    json_bytes = json.dumps(
+                        build_json_payload(issues, config), ensure_ascii=False, indent=2
+                    ).encode("utf-8")
+                    csv_bytes = render_csv_bytes(issues)
+                    server.update(name, json_bytes, csv_bytes, len(issues))
+
+                    base = os.path.join(args.output_dir, f"{OUTPUT_PREFIX}_{name}")
+                    if "json" in formats:
+                        atomic_write(base + ".json", json_bytes)
+                    if "csv" in formats:
+                        atomic_write(base + ".csv", csv_bytes)
+                    if "snap" in formats:
+                        write_snapshot(issues, base + SNAPSHOT_SUFFIX, {"target": name})
+                    if "xlsx" in formats:
+                        # 需要整文件原子替换，因此不拆分为多进程分卷
+                        temp_xlsx = base + ".tmp.xlsx"
+                        if export_to_excel(issues, temp_xlsx, parallel=False):
+                            os.replace(temp_xlsx, base + ".xlsx")
+
+                    target_state["fingerprint"] = fingerprint
+                    target_state["interval"] = args.interval
+                    print(f"[{name}] 快照已刷新: {len(issues)}条")
+                elif changed:
+                    # 获取失败：保留旧快照，按最小间隔重试
+                    target_state["interval"] = args.interval
+                else:
+                    # 无变化：逐步放宽轮询间隔
+                    target_state["interval"] = min(
+                        target_state["interval"] * 2, args.max_interval
+                    )
+
+                target_state["next_poll"] = time.monotonic() + target_state["interval"]
+
+            next_poll = min(s["next_poll"] for s in state.values())
+            time.sleep(max(0.5, next_poll - time.monotonic()))
+    except KeyboardInterrupt:
+        print("\n退出监视模式")
+    finally:
+        server.stop()
+
+
+# check模式可用的类型选择器
+ISSUE_TYPES = ["BUG", "VULNERABILITY", "CODE_SMELL", "SECURITY_HOTSPOT"]
+
+
+def parse_threshold(expression):
+    """解析阈值表达式，如 BLOCKER>0、CRITICAL@src/>20、BUG@changed>=1
+
+    选择器可以是严重级别、issue类型或TOTAL；@后为文件路径前缀，
+    @changed 表示 --changed-files 中列出的文件。
+    """
+    match = re.fullmatch(r"\s*([A-Za-z_]+)(?:@(\S+?))?\s*(>=|>)\s*(\d+)\s*", expression)
+    if not match:
+        raise ValueError(f"无效的阈值表达式: {expression}")
+    selector, path, op, limit = match.groups()
+    selector = selector.upper()
+    if selector not in SEVERITY_LEVELS + ISSUE_TYPES + ["TOTAL"]:
+        raise ValueError(f"未知的阈值选择器: {selector}")
+    return {
+        "expr": expression.strip(),
+        "selector": selector,
+        "path": path,
+        "op": op,
+        "limit": int(limit),
+        "count": 0,
+        "bound": None,  # 提前结束时计数只是上限(upper)或下限(lower)
+    }
+
+
+def threshold_violated(threshold, count):
+    if threshold["op"] == ">=":
+        return count >= threshold["limit"]
+    return count > threshold["limit"]
+
+
+def threshold_matches(threshold, row, changed_files):
+    """判断一条issue是否计入该阈值"""
+    selector = threshold["selector"]
+    if selector in SEVERITY_LEVELS and row["严重级别"] != selector:
+        return False
+    if selector in ISSUE_TYPES and row["类型"] != selector:
+        return False
+    path = threshold["path"]
+    if path == "changed":
+        return row["文件路径"] in changed_files
+    return not path or row["文件路径"].startswith(path)
+
+
+def facet_count(data, selector):
+    """从facets结果中读取选择器对应的数量"""
+    if selector == "TOTAL":
+        return data.get("total", 0)
+    for facet in data.get("facets", []):
+        for value in facet.get("values", []):
+            if value.get("val") == selector:
+                return value.get("count", 0)
+    return 0
+
+
+async def evaluate_thresholds(
+    client, config, thresholds, branch, pr_number, statuses, changed_files
+):
+    """评估阈值，结论确定后立即停止获取，返回实际发出的HTTP请求数
+
+    先用一次facets请求得到各严重级别/类型的数量：不带路径的阈值直接得出结论，
+    带路径的阈值以该数量为上限，上限不超标时无需逐页获取。
+    其余阈值在逐页获取时更新计数，任一超标或剩余issues不足以改变结论时停止。
+    """
+    requests_before = client.requests_sent
+    headers = build_auth_headers(config)
+    params = build_issue_params(config, branch, pr_number, None, statuses)
+    params["facets"] = "severities,types"
+    data = await fetch_issue_page(client, headers, params, 1, page_size=1)
+
+    pending = []
+    for threshold in thresholds:
+        upper_bound = facet_count(data, threshold["selector"])
+        if not threshold["path"]:
+            threshold["count"] = upper_bound
+        elif not threshold_violated(threshold, upper_bound):
+            # 路径范围内的数量不会超过整体数量
+            threshold["count"] = upper_bound
+            threshold["bound"] = "upper"
+        else:
+            pending.append(threshold)
+
+    if not pending or any(
+        threshold_violated(t, t["count"]) for t in thresholds if not t["path"]
+    ):
+        for threshold in pending:
+            threshold["bound"] = "lower"
+        return client.requests_sent - requests_before
+
+    # 仅当剩余阈值都针对严重级别时，按严重级别过滤以减少页数
+    selectors = {t["selector"] for t in pending}
+    severities = None
+    if selectors <= set(SEVERITY_LEVELS):
+        severities = ",".join(sorted(selectors))
+    remaining = sum(facet_count(data, s) for s in selectors) if severities else None
+    if remaining is None:
+        remaining = data.get("total", 0)
+
+    def on_page(rows):
+        nonlocal remaining
+        remaining -= len(rows)
+        for row in rows:
+            for threshold in pending:
+                if threshold_matches(threshold, row, changed_files):
+                    threshold["count"] += 1
+        if any(threshold_violated(t, t["count"]) for t in pending):
+            return True  # 已确定失败
+        # 剩余issues全部计入也不会超标时，可确定通过
+        return all(
+            not threshold_violated(t, t["count"] + max(remaining, 0)) for t in pending
+        )
+
+    await fetch_issues_async(
+        client,
+        config,
+        on_page,
+        branch,
+        pr_number,
+        severities,
+        statuses,
+        verbose=False,
+        window=1,  # 逐页获取：结论确定时不会有已发出但用不到的请求
+    )
+    if remaining > 0:
+        for threshold in pending:
+            if threshold_violated(threshold, threshold["count"]):
+                threshold["bound"] = "lower"
+            elif any(threshold_violated(t, t["count"]) for t in pending):
+                threshold["bound"] = "lower"  # 因其他阈值失败而提前结束
+            else:
+                threshold["count"] += remaining
+                threshold["bound"] = "upper"
+    return client.requests_sent - requests_before
+
+
+def load_thresholds(args):
+    """合并命令行与阈值文件中的阈值表达式"""
+    expressions = list(args.threshold or [])
+    if args.thresholds_file:
+        with open(args.thresholds_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("thresholds", [])
+        expressions.extend(data)
+    return [parse_threshold(expression) for expression in expressions]
+
+
+def run_check(config, args):
+    """check模式：按阈值评估分支/PR，返回进程退出码（0通过，1未通过，2出错）"""
+    started = time.monotonic()
+    report = {
+        "status": "error",
+        "project": config.project_key,
+        "branch": args.branch,
+        "pr_number": args.pr,
+        "thresholds": [],
+    }
+    try:
+        thresholds = load_thresholds(args)
+        if not thresholds:
+            raise ValueError("未提供阈值，请使用 --threshold 或 --thresholds-file")
+        changed_files = set()
+        if args.changed_files:
+            with open(args.changed_files, "r", encoding="utf-8") as f:
+                changed_files = {line.strip() for line in f if line.strip()}
+
+        with PROFILER.stage("check"):
+            report["requests"] = run_with_client(
+                config,
+                evaluate_thresholds,
+                config,
+                thresholds,
+                None if args.pr else args.branch,
+                args.pr,
+                args.statuses,
+                changed_files,
+            )
+        failed = [t for t in thresholds if threshold_violated(t, t["count"])]
+        report["status"] = "failed" if failed else "passed"
+        report["thresholds"] = [
+            {
+                "threshold": t["expr"],
+                "count": t["count"],
+                "bound": t["bound"],
+                # 下限计数未超标时无法确定是否通过
+                "passed": (
+                    False
+                    if threshold_violated(t, t["count"])
+                    else None if t["bound"] == "lower" else True
+                ),
+            }
+            for t in thresholds
+        ]
+    except Exception as e:
+        report["error"] = str(e)
+    report["elapsed_seconds"] = round(time.monotonic() - started, 3)
+
+    if args.report:
+        atomic_write(
+            args.report,
+            json.dumps(report, ensure_ascii=False, indent=2).encode("utf-8"),
+        )
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+    else:
+        scope = f"PR #{args.pr}" if args.pr else f"分支 {args.branch or '汇总'}"
+        print(f"质量阈值检查: {config.project_key} {scope}")
+        for item in report["thresholds"]:
+            mark = {True: "通过", False: "未通过", None: "未确定"}[item["passed"]]
+            prefix = {"upper": "≤", "lower": "≥"}.get(item["bound"], "")
+            print(f"  [{mark}] {item['threshold']}  实际: {prefix}{item['count']}")
+        if report["status"] == "error":
+            print(f"错误：{report['error']}")
+        else:
+            print(
+                f"结论: {'通过' if report['status'] == 'passed' else '未通过'}"
+                f"（{report['requests']}次请求，{report['elapsed_seconds']}秒）"
+            )
+
+    return {"passed": 0, "failed": 1}.get(report["status"], 2)
+
+
+def issue_sort_key(issue):
+    """导出记录的排序键：文件路径、行号（数值）、Issue Key"""
+    line = issue.get("行号")
+    return (
+        issue.get("文件路径") or "",
+        line if isinstance(line, int) else -1,
+        issue.get("Issue Key") or "",
+    )
+
+
+def sort_issues(issues):
+    """按文件路径、行号、Issue Key稳定排序，保证相同数据导出结果一致"""
+    return sorted(issues, key=issue_sort_key)
+
+
+def compute_content_hash(issues, config):
+    """对规范化后的issues记录计算SHA-256内容哈希（issues需已排序）"""
+    digest = hashlib.sha256()
+    digest.update(f"{config.organization}\n{config.project_key}\n".encode("utf-8"))
+    for issue in issues:
+        record = json.dumps(
+            issue, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+        digest.update(record.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def load_export_state():
+    """读取上次导出的记录（各格式的文件名与内容哈希）"""
+    try:
+        with open(EXPORT_STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def export_output_exists(filename):
+    """导出文件是否存在（并行导出的Excel以分卷清单为准）"""
+    stem, _ = os.path.splitext(filename)
+    return os.path.exists(filename) or os.path.exists(f"{stem}_manifest.json")
+
+
+def export_filename(ext, timestamp, content_hash, naming):
+    """按命名模式生成导出文件名"""
+    if naming == "hash":
+        return f"{OUTPUT_PREFIX}_{content_hash[:16]}.{ext}"
+    if naming == "fixed":
+        return f"{OUTPUT_PREFIX}.{ext}"
+    return f"{OUTPUT_PREFIX}_{timestamp}.{ext}"
+
+
+def export_issues(issues, export_choices, config):
+    """按所选格式导出issues，并在旁边写入本地快照供离线重新筛选
+
+    内容与上次导出相同时，hash/fixed命名模式直接跳过写入；
+    timestamp模式按unchanged_action决定照常写入、跳过或创建指向上次文件的符号链接。
+    """
+    print("\n" + "=" * 60)
+    print("开始导出...")
+    print("=" * 60)
+
+    issues = sort_issues(issues)
+    content_hash = compute_content_hash(issues, config)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    state = load_export_state()
+    success = False
+
+    exporters = {
+        "1": ("Excel", "xlsx", lambda f: export_to_excel(issues, f)),
+        "2": ("CSV", "csv", lambda f: export_to_csv(issues, f)),
+        "3": ("JSON", "json", lambda f: export_to_json(issues, f, config)),
+    }
+    exporters["snapshot"] = (
+        "快照",
+        SNAPSHOT_SUFFIX.lstrip("."),
+        lambda f: export_to_snapshot(issues, f, config),
+    )
+
+    for choice in list(export_choices) + ["snapshot"]:
+        if choice == "snapshot" and not success:
+            break  # 常规导出全部失败时不写快照
+        label, ext, export = exporters[choice]
+        filename = export_filename(ext, timestamp, content_hash, config.output_naming)
+        print(f"\n[{label}] 导出: {filename}")
+
+        previous = state.get(ext, {})
+        unchanged = previous.get("hash") == content_hash and export_output_exists(
+            previous.get("file", "")
+        )
+        if config.output_naming != "timestamp":
+            # 目标文件本身已是这份内容时才跳过
+            unchanged = unchanged and previous["file"] == filename
+            if config.output_naming == "hash" and export_output_exists(filename):
+                unchanged, previous = True, {"file": filename}
+
+        if unchanged and (
+            config.output_naming != "timestamp" or config.unchanged_action == "skip"
+        ):
+            print(f"    内容未变化，跳过写入（沿用 {previous['file']}）")
+            success = True
+            continue
+        if (
+            unchanged
+            and config.unchanged_action == "symlink"
+            and os.path.isfile(previous["file"])
+        ):
+            try:
+                os.symlink(previous["file"], filename)
+                print(f"    内容未变化，已链接到 {previous['file']}")
+                success = True
+                continue
+            except OSError as e:
+                print(f"    警告：无法创建符号链接({e})，改为正常写入")
+
+        with PROFILER.stage(f"export_{ext}"):
+            done = export(filename)
+        if done:
+            print("    完成")
+            success = True
+            state[ext] = {"file": filename, "hash": content_hash}
+
+    if success:
+        try:
+            atomic_write(
+                EXPORT_STATE_FILE,
+                json.dumps(state, ensure_ascii=False, indent=2).encode("utf-8"),
+            )
+        except OSError as e:
+            print(f"警告：无法保存导出记录: {e}")
+
+    # 最终报告
+    print("\n" + "=" * 60)
+    if success:
+        print("导出完成!")
+        print(f"内容哈希: {content_hash[:16]}")
+        print(f"文件保存在: {os.getcwd()}")
+    else:
+        print("导出失败，请检查错误信息")
+    print("=" * 60)
+    return success
+
+
+def parse_choice_list(prompt):
+    """读取逗号分隔的输入，返回大写去重后的集合；直接回车返回None"""
+    choice = input(prompt).strip()
+    if not choice:
+        return None
+    return {item.strip().upper() for item in choice.split(",") if item.strip()}
+
+
+def export_from_snapshot(config):
+    """从本地快照重新筛选并导出，无需访问网络"""
+    # 跳过无法读取的条目（如symlink模式下目标已被删除的悬空链接）
+    snapshots = []
+    for name in os.listdir("."):
+        if name.endswith(SNAPSHOT_SUFFIX):
+            try:
+                snapshots.append((os.path.getmtime(name), name))
+            except OSError:
+                continue
+    snapshots = [name for _, name in sorted(snapshots, reverse=True)]
+    if not snapshots:
+        print("\n当前目录下没有本地快照，请先执行一次导出")
+        return
+
+    print("\n" + "=" * 60)
+    print("选择本地快照")
+    print("=" * 60)
+    for index, name in enumerate(snapshots[:10], 1):
+        print(f"({index}) {name}")
+    print("(0) 返回主菜单")
+    print("=" * 60)
+
+    choice = input("请选择 [1]: ").strip() or "1"
+    if choice == "0":
+        return
+    if not choice.isdigit() or not 1 <= int(choice) <= min(len(snapshots), 10):
+        print("无效选项")
+        return
+
+    try:
+        snapshot = IssueSnapshot(snapshots[int(choice) - 1])
+    except (OSError, ValueError) as e:
+        print(f"错误：无法打开快照: {e}")
+        return
+
+    with snapshot:
+        print(f"快照共 {len(snapshot)} 条issues")
+        print(f"可选状态: {', '.join(snapshot.values('状态'))}")
+        severities = select_severity_levels()
+        statuses = parse_choice_list("请输入状态（逗号分隔，回车表示全部）: ")
+        types = parse_choice_list("请输入类型（逗号分隔，回车表示全部）: ")
+        rules = input("请输入规则（如S1481，逗号分隔，回车表示全部）: ").strip()
+        path_prefix = input("请输入文件路径前缀（回车表示全部）: ").strip()
+
+        selected = snapshot.filter(
+            severities=set(severities.split(",")) if severities else None,
+            types=types,
+            statuses=statuses,
+            rules={r.strip() for r in rules.split(",") if r.strip()} or None,
+            path_prefix=path_prefix or None,
+        )
+        print(f"\n筛选结果: {len(selected)} 条")
+        if not len(selected):
+            return
+        issues = snapshot.rows_for(selected)
+
+    export_choices = show_export_menu(config)
+    if export_choices is None:
+        return
+    export_issues(issues, export_choices, config)
+
+
+class FakeSonarCloud:
+    """soak测试用的本地假SonarCloud/GitHub服务
+
+    issues按序号即时生成，不在内存中保存数据集，因此可以模拟数百万条issues；
+    支持注入响应延迟抖动和随机5xx错误，并统计当前打开的连接数用于检测连接泄漏。
+    """
+
+    def __init__(self, total_issues, latency=0.0, jitter=0.0, error_rate=0.0):
+        self.total_issues = total_issues
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.injected_errors = 0
+        self.open_connections = 0
+        self.asset = os.urandom(256 * 1024)
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self._httpd = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def release(self):
+        """与GitHub release接口格式相同的最新版本信息，附带安装包的SHA-256"""
+        tag = "v9.9.9"
+        name = f"sonarcloud_issues-{tag}-win.exe"
+        return {
+            "tag_name": tag,
+            "assets": [
+                {
+                    "name": name,
+                    "browser_download_url": f"{self.base_url}/download/{tag}/{name}",
+                    "digest": "sha256:" + hashlib.sha256(self.asset).hexdigest(),
+                    "size": len(self.asset),
+                }
+            ],
+        }
+
+    @staticmethod
+    def make_issue(index):
+        return {
+            "key": f"SOAK-{index}",
+            "type": ISSUE_TYPES[index % 3],
+            "severity": SEVERITY_LEVELS[index % 5],
+            "status": "OPEN",
+            "component": f"soak_project:src/module{index % 97}/file{index % 1009}.py",
+            "line": index % 700 + 1,
+            "message": f"Synthetic issue {index}",
+            "creationDate": "2025-01-01T00:00:00+0000",
+            "updateDate": "2025-01-02T00:00:00+0000",
+            "author": f"dev{index % 13}@example.com",
+            "rule": f"python:S{1000 + index % 211}",
+        }
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # 保持连接，才能观察客户端的连接复用与泄漏
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.open_connections += 1
+
+            def finish(self):
+                super().finish()
+                with fake._lock:
+                    fake.open_connections -= 1
+
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests += 1
+                    delay = fake.latency + fake._random.uniform(
+                        -fake.jitter, fake.jitter
+                    )
+                    failed = fake._random.random() < fake.error_rate
+                    if failed:
+                        fake.injected_errors += 1
+                time.sleep(max(0.0, delay))
+                if failed:
+                    return self._reply(503, b"injected error")
+
+                url = urllib.parse.urlsplit(self.path)
+                if url.path.endswith("/releases/latest"):
+                    body = json.dumps(fake.release()).encode()
+                    return self._reply(200, body, "application/json")
+                if url.path.endswith(".exe"):
+                    return self._reply(200, fake.asset, "application/octet-stream")
+
+                query = dict(urllib.parse.parse_qsl(url.query))
+                page_size = int(query.get("ps", 100))
+                page = int(query.get("p", 1))
+                start = (page - 1) * page_size
+                end = min(fake.total_issues, start + page_size)
+                body = json.dumps(
+                    {
+                        "total": fake.total_issues,
+                        "p": page,
+                        "ps": page_size,
+                        "issues": [fake.make_issue(i) for i in range(start, end)],
+                    }
+                ).encode()
+                return self._reply(200, body, "application/json")
+
+            def _reply(self, code, body, content_type="text/plain"):
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def current_rss_mb():
+    """当前进程常驻内存（MB），不支持的平台返回None"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def open_fd_count():
+    """当前进程打开的文件描述符数量，不支持的平台返回None"""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def run_soak_iteration(config, output_dir, formats):
+    """执行一轮完整流程：分页获取 → 导出 → 检查更新并下载，返回issues数量"""
+    issues = []
+    run_with_client(config, fetch_issues_async, config, issues.extend, verbose=False)
+
+    base = os.path.join(output_dir, OUTPUT_PREFIX)
+    exporters = {
+        "xlsx": lambda: export_to_excel(issues, base + ".xlsx"),
+        "csv": lambda: export_to_csv(issues, base + ".csv"),
+        "json": lambda: export_to_json(issues, base + ".json", config),
+        "snap": lambda: export_to_snapshot(issues, base + SNAPSHOT_SUFFIX, config),
+    }
+    for fmt in formats:
+        if not exporters[fmt]():
+            raise RuntimeError(f"{fmt} 导出失败")
+
+    # 与自动更新走同一路径：获取release信息 → 解析下载地址 → 下载并校验SHA-256
+    release = get_latest_release(config, use_cache=False)
+    latest_tag = release and release.get("tag_name")
+    if not latest_tag:
+        raise RuntimeError("获取最新版本失败")
+    if not download_release(config, release, latest_tag, base + ".exe"):
+        raise RuntimeError("下载更新失败")
+    os.remove(base + ".exe")
+    return len(issues)
+
+
+def analyze_soak(samples, args):
+    """根据每轮采样计算内存增长、句柄/连接泄漏和吞吐漂移，给出是否通过"""
+    measured = samples[args.warmup :] or samples
+    ok = [s for s in measured if s["error"] is None]
+    checks = []
+
+    rss = [s["rss_mb"] for s in ok if s["rss_mb"] is not None]
+    if len(rss) >= 2:
+        growth = rss[-1] - rss[0]
+        # 最小二乘斜率：每轮平均增长
+        xs = range(len(rss))
+        mean_x, mean_y = sum(xs) / len(rss), sum(rss) / len(rss)
+        denominator = sum((x - mean_x) ** 2 for x in xs)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, rss)) / denominator
+        checks.append(
+            {
+                "name": "memory_growth_mb",
+                "value": round(growth, 2),
+                "slope_mb_per_iteration": round(slope, 3),
+                "limit": args.max_rss_growth,
+                "passed": growth <= args.max_rss_growth,
+            }
+        )
+
+    for name, key, limit in (
+        ("fd_growth", "fds", args.max_fd_growth),
+        ("thread_growth", "threads", 0),
+        ("open_connections_after_iteration", "server_connections", 0),
+    ):
+        values = [s[key] for s in ok if s[key] is not None]
+        if len(values) >= 2 or (values and key == "server_connections"):
+            value = (
+                values[-1] if key == "server_connections" else values[-1] - values[0]
+            )
+            checks.append(
+                {"name": name, "value": value, "limit": limit, "passed": value <= limit}
+            )
+
+    throughput = [s["issues_per_second"] for s in ok]
+    if len(throughput) >= 3:
+        third = max(1, len(throughput) // 3)
+        first = statistics.median(throughput[:third])
+        last = statistics.median(throughput[-third:])
+        drift = (first - last) / first * 100 if first else 0.0
+        checks.append(
+            {
+                "name": "throughput_drift_percent",
+                "value": round(drift, 1),
+                "limit": args.max_throughput_drift,
+                "passed": drift <= args.max_throughput_drift,
+            }
+        )
+
+    failures = sum(1 for s in samples if s["error"] is not None)
+    checks.append(
+        {
+            "name": "failed_iterations",
+            "value": failures,
+            "limit": args.max_failures,
+            "passed": failures <= args.max_failures,
+        }
+    )
+    return checks
+
+
+def run_soak(args):
+    """soak测试：对本地假服务长时间反复运行完整流程，返回退出码（0通过，1未通过）"""
+    global API_URL, GITHUB_API_URL, UPDATE_BASE_URL
+
+    fake = FakeSonarCloud(
+        args.issues, args.latency / 1000, args.jitter / 1000, args.error_rate
+    )
+    fake.start()
+    saved_urls = API_URL, GITHUB_API_URL, UPDATE_BASE_URL
+    API_URL = f"{fake.base_url}/api/issues/search"
+    GITHUB_API_URL = f"{fake.base_url}/repos/soak/releases/latest"
+    UPDATE_BASE_URL = fake.base_url + "/download/{version}"
+
+    # 沿用配置中的性能参数，连接信息换成假服务
+    config = AppConfig(**(CONFIG_STORE.merged_values() or {}))
+    config = dataclasses.replace(
+        config,
+        sonar_token="soak",
+        project_key="soak_project",
+        organization="soak",
+        update_mirror="",
+    )
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+
+    print(f"soak测试: {args.issues}条issues，延迟{args.latency}±{args.jitter}ms，")
+    print(
+        f"错误率{args.error_rate:.1%}，时长{args.duration}秒，格式: {','.join(formats)}"
+    )
+    print("=" * 60)
+
+    samples = []
+    deadline = time.monotonic() + args.duration
+    try:
+        with (
+            tempfile.TemporaryDirectory() as output_dir,
+            open(os.devnull, "w") as devnull,
+        ):
+            while time.monotonic() < deadline or len(samples) <= args.warmup:
+                if args.iterations and len(samples) >= args.iterations:
+                    break
+                started = time.perf_counter()
+                error = None
+                count = 0
+                try:
+                    with contextlib.redirect_stdout(devnull):
+                        count = run_soak_iteration(config, output_dir, formats)
+                except Exception as e:
+                    error = str(e)
+                elapsed = time.perf_counter() - started
+                gc.collect()
+                time.sleep(0.2)  # 等待服务端感知连接关闭
+
+                sample = {
+                    "iteration": len(samples) + 1,
+                    "seconds": round(elapsed, 3),
+                    "issues": count,
+                    "issues_per_second": round(count / elapsed, 1) if elapsed else 0,
+                    "rss_mb": current_rss_mb(),
+                    "fds": open_fd_count(),
+                    "threads": threading.active_count(),
+                    "server_connections": fake.open_connections,
+                    "error": error,
+                }
+                samples.append(sample)
+                rss = f"{sample['rss_mb']:.1f}MB" if sample["rss_mb"] else "N/A"
+                print(
+                    f"第{sample['iteration']}轮: {count}条 {elapsed:.2f}秒 "
+                    f"({sample['issues_per_second']}条/秒) 内存{rss} "
+                    f"句柄{sample['fds']} 线程{sample['threads']}"
+                    + (f" 错误: {error}" if error else "")
+                )
+    except KeyboardInterrupt:
+        print("\n提示：soak测试被中断，基于已完成的轮次生成报告")
+    finally:
+        API_URL, GITHUB_API_URL, UPDATE_BASE_URL = saved_urls
+        fake.stop()
+
+    checks = analyze_soak(samples, args)
+    passed = all(check["passed"] for check in checks)
+    report = {
+        "status": "passed" if passed else "failed",
+        "parameters": {
+            "issues": args.issues,
+            "latency_ms": args.latency,
+            "jitter_ms": args.jitter,
+            "error_rate": args.error_rate,
+            "formats": formats,
+            "warmup": args.warmup,
+        },
+        "server": {
+            "requests": fake.requests,
+            "injected_errors": fake.injected_errors,
+        },
+        "checks": checks,
+        "samples": samples,
+    }
+
+    print("=" * 60)
+    for check in checks:
+        mark = "通过" if check["passed"] else "未通过"
+        print(f"[{mark}] {check['name']}: {check['value']} (上限 {check['limit']})")
+    print(f"服务端请求数: {fake.requests}，注入错误: {fake.injected_errors}")
+    print(f"结论: {'通过' if passed else '未通过'}")
+    if args.report:
+        atomic_write(
+            args.report,
+            json.dumps(report, ensure_ascii=False, indent=2).encode("utf-8"),
+        )
+        print(f"报告已保存: {args.report}")
+    return 0 if passed else 1
+
+
+# 热点排行中各严重级别的权重
+SEVERITY_WEIGHTS = {"BLOCKER": 10, "CRITICAL": 5, "MAJOR": 3, "MINOR": 1, "INFO": 0.5}
+
+
+class CountMinSketch:
+    """Count-Min计数草图：固定内存的近似计数，估计值只会偏大不会偏小"""
+
+    def __init__(self, width=16384, depth=4):
+        self.width = width
+        self.depth = depth
+        self._rows = [[0.0] * width for _ in range(depth)]
+
+    def _buckets(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4 * self.depth)
+        raw = digest.digest()
+        return [
+            int.from_bytes(raw[i * 4 : i * 4 + 4], "little") % self.width
+            for i in range(self.depth)
+        ]
+
+    def add(self, key, value=1.0):
+        """累加并返回该key的当前估计值"""
+        estimate = None
+        for row, bucket in zip(self._rows, self._buckets(key)):
+            row[bucket] += value
+            if estimate is None or row[bucket] < estimate:
+                estimate = row[bucket]
+        return estimate
+
+    def estimate(self, key):
+        return min(row[b] for row, b in zip(self._rows, self._buckets(key)))
+
+
+class TopKTracker:
+    """用Count-Min草图加大小为K的最小堆，流式维护加权计数最高的K个key
+
+    每次更新O(log K)，内存与不同key的总数无关。堆中的过期条目延迟清理。
+    """
+
+    def __init__(self, k, sketch_width=16384):
+        self.k = k
+        self.weights = CountMinSketch(sketch_width)
+        self.counts = CountMinSketch(sketch_width)
+        self._candidates = {}
+        self._heap = []
+
+    def add(self, key, weight, count=1):
+        estimate = self.weights.add(key, weight)
+        self.counts.add(key, count)
+        if self.k <= 0:
+            return
+        if key in self._candidates or len(self._candidates) < self.k:
+            self._candidates[key] = estimate
+            heapq.heappush(self._heap, (estimate, key))
+        else:
+            self._drop_stale()
+            if estimate > self._heap[0][0]:
+                _, evicted = heapq.heapreplace(self._heap, (estimate, key))
+                del self._candidates[evicted]
+                self._candidates[key] = estimate
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(est, key) for key, est in self._candidates.items()]
+            heapq.heapify(self._heap)
+
+    def _drop_stale(self):
+        # 堆顶若不是候选key的最新估计值，则是过期条目
+        while self._candidates.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def top(self):
+        """按加权得分从高到低返回 [(key, 得分, issues数)]"""
+        ranked = sorted(self._candidates.items(), key=lambda item: (-item[1], item[0]))
+        return [(key, score, int(self.counts.estimate(key))) for key, score in ranked]
+
+
+class HotspotRanker:
+    """流式统计文件、规则和目录热点，不保存完整issues列表"""
+
+    def __init__(self, top_files=50, top_rules=20, top_dirs=20, depth=2, weights=None):
+        self.depth = depth
+        self.weights = weights or SEVERITY_WEIGHTS
+        self.total_issues = 0
+        self.total_weight = 0.0
+        self.files = TopKTracker(top_files)
+        self.rules = TopKTracker(top_rules)
+        self.directories = TopKTracker(top_dirs)
+
+    def add_rows(self, rows):
+        """处理一页issues；先在页内聚合，再更新草图和堆"""
+        files = collections.defaultdict(lambda: [0.0, 0])
+        rules = collections.defaultdict(lambda: [0.0, 0])
+        directories = collections.defaultdict(lambda: [0.0, 0])
+        for row in rows:
+            weight = self.weights.get(row["严重级别"], 0)
+            path = row["文件路径"] or "(无文件)"
+            for key, bucket in ((path, files), (row["规则"] or "(无规则)", rules)):
+                bucket[key][0] += weight
+                bucket[key][1] += 1
+            parts = path.split("/")[:-1]
+            for level in range(1, min(self.depth, len(parts)) + 1):
+                entry = directories["/".join(parts[:level]) + "/"]
+                entry[0] += weight
+                entry[1] += 1
+            self.total_weight += weight
+        self.total_issues += len(rows)
+
+        for tracker, aggregated in (
+            (self.files, files),
+            (self.rules, rules),
+            (self.directories, directories),
+        ):
+            for key, (weight, count) in aggregated.items():
+                tracker.add(key, weight, count)
+
+    def results(self):
+        def table(tracker, column):
+            return [
+                {column: key, "加权得分": round(score, 1), "issues数": count}
+                for key, score, count in tracker.top()
+            ]
+
+        return {
+            "files": table(self.files, "文件路径"),
+            "rules": table(self.rules, "规则"),
+            "directories": table(self.directories, "目录"),
+        }
+
+
+def export_hotspots(ranker, base_name, formats, config):
+    """导出热点排行：xlsx为三个工作表，json包含元数据与三张表"""
+    results = ranker.results()
+    written = []
+    if "xlsx" in formats:
+        filename = f"{base_name}.xlsx"
+        with pd.ExcelWriter(filename, engine="openpyxl") as writer:
+            for sheet, key in (
+                ("文件", "files"),
+                ("规则", "rules"),
+                ("目录", "directories"),
+            ):
+                pd.DataFrame(results[key]).to_excel(
+                    writer, sheet_name=sheet, index=False
+                )
+        written.append(filename)
+    if "json" in formats:
+        filename = f"{base_name}.json"
+        payload = {
+            "metadata": {
+                "project": config.project_key,
+                "organization": config.organization,
+                "exported_at": datetime.now().isoformat(),
+                "total_issues": ranker.total_issues,
+                "total_weight": ranker.total_weight,
+                "severity_weights": ranker.weights,
+                "version": CURRENT_VERSION,
+            },
+            **results,
+        }
+        atomic_write(
+            filename, json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+        )
+        written.append(filename)
+    return written
+
+
+def run_ranking(config, branch, pr_number, severities, statuses, options):
+    """流式获取issues并计算热点排行，返回HotspotRanker；失败返回None"""
+    ranker = HotspotRanker(
+        options.get("top_files", 50),
+        options.get("top_rules", 20),
+        options.get("top_dirs", 20),
+        options.get("depth", 2),
+        options.get("weights"),
+    )
+
+    def on_page(rows):
+        ranker.add_rows(rows)
+        print(f"\r已统计 {ranker.total_issues} 条issues", end="")
+
+    try:
+        with PROFILER.stage("rank"):
+            run_with_client(
+                config,
+                fetch_issues_async,
+                config,
+                on_page,
+                branch,
+                pr_number,
+                severities,
+                statuses,
+                verbose=False,
+            )
+    except Exception as e:
+        print()
+        report_fetch_error(e)
+        return None
+    print()
+    return ranker
+
+
+def show_hotspots(ranker, limit=10):
+    """在控制台显示各排行的前几项"""
+    results = ranker.results()
+    for title, key, column in (
+        ("文件热点", "files", "文件路径"),
+        ("规则热点", "rules", "规则"),
+        ("目录热点", "directories", "目录"),
+    ):
+        print(f"\n{title}（前{min(limit, len(results[key]))}项）")
+        print("-" * 60)
+        for index, item in enumerate(results[key][:limit], 1):
+            print(
+                f"{index:>3}. {item['加权得分']:>10} {item['issues数']:>7}  {item[column]}"
+            )
+
+
+def parse_weights(text):
+    """解析权重覆盖，如 BLOCKER=20,INFO=0"""
+    weights = dict(SEVERITY_WEIGHTS)
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, value = item.partition("=")
+        name = name.strip().upper()
+        if name not in SEVERITY_LEVELS:
+            raise ValueError(f"未知严重级别: {name}")
+        weights[name] = float(value)
+    return weights
+
+
+def rank_hotspots_interactive(config):
+    """主菜单：选择范围后生成热点排行"""
+    scope = select_scope(config)
+    if scope is None:
+        return
+    branch, pr_number = scope
+    ranker = run_ranking(config, branch, pr_number, None, "OPEN", {})
+    if ranker is None:
+        return
+    show_hotspots(ranker)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for filename in export_hotspots(
+        ranker, f"{HOTSPOT_PREFIX}_{timestamp}", ["xlsx", "json"], config
+    ):
+        print(f"已导出: {filename}")
+
+
+def run_rank_command(config, args):
+    """rank子命令"""
+    try:
+        weights = parse_weights(args.weights or "")
+    except ValueError as e:
+        print(f"错误：{e}")
+        return 2
+    ranker = run_ranking(
+        config,
+        None if args.pr else args.branch,
+        args.pr,
+        args.severities,
+        args.statuses,
+        {
+            "top_files": args.top_files,
+            "top_rules": args.top_rules,
+            "top_dirs": args.top_dirs,
+            "depth": args.depth,
+            "weights": weights,
+        },
+    )
+    if ranker is None:
+        return 2
+    show_hotspots(ranker)
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    base_name = args.output or (
+        f"{HOTSPOT_PREFIX}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    )
+    for filename in export_hotspots(ranker, base_name, formats, config):
+        print(f"已导出: {filename}")
+    return 0
 
 
 def show_main_menu():
@@ -791,12 +3449,190 @@ def show_main_menu():
     print("=" * 60)
     print("(1) 导出Issues")
     print("(2) 设置")
+    print("(3) 从本地快照筛选导出")
+    print("(4) 文件/规则热点排行")
     print("(0) 退出程序")
     print("=" * 60)
 
 
+def parse_args(argv=None):
+    """解析命令行参数；不带子命令时进入交互式菜单"""
+    parser = argparse.ArgumentParser(description="SonarCloud Issues 导出工具")
+    parser.add_argument(
+        "--config-profile", help="使用配置文件中的指定档案（默认为当前激活档案）"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="采集获取/导出各阶段的性能数据（pstats与火焰图collapsed stacks）",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default="sonarcloud_profile",
+        help="性能数据输出目录 [sonarcloud_profile]",
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=20, help="热点汇总显示的函数数 [20]"
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="覆盖配置项（可重复），如 --set page_size=200 --set max_retries=5",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    watch = subparsers.add_parser("watch", help="监视模式：持续刷新issues快照")
+    watch.add_argument("--branch", action="append", help="要监视的分支（可重复）")
+    watch.add_argument("--pr", action="append", help="要监视的PR编号（可重复）")
+    watch.add_argument(
+        "--all-branches", action="store_true", help="同时监视所有分支汇总"
+    )
+    watch.add_argument("--severities", help="严重级别过滤，如 BLOCKER,CRITICAL")
+    watch.add_argument("--statuses", default="OPEN", help="状态过滤 [OPEN]")
+    watch.add_argument(
+        "--interval", type=float, default=60, help="最小轮询间隔（秒）[60]"
+    )
+    watch.add_argument(
+        "--max-interval",
+        type=float,
+        default=900,
+        help="无变化时的最大轮询间隔（秒）[900]",
+    )
+    watch.add_argument("--output-dir", default=".", help="快照导出目录 [当前目录]")
+    watch.add_argument(
+        "--formats",
+        default="json,csv,snap",
+        help="写入的格式: json,csv,xlsx,snap [json,csv,snap]",
+    )
+    watch.add_argument("--host", default="127.0.0.1", help="HTTP监听地址 [127.0.0.1]")
+    watch.add_argument(
+        "--port", type=int, default=8765, help="HTTP端口，0表示不启动 [8765]"
+    )
+
+    check = subparsers.add_parser("check", help="按质量阈值检查分支/PR（用于CI）")
+    check.add_argument("--branch", help="要检查的分支（默认为所有分支汇总）")
+    check.add_argument("--pr", help="要检查的PR编号")
+    check.add_argument(
+        "--threshold",
+        action="append",
+        help="失败条件（可重复），如 BLOCKER>0、CRITICAL@changed>20、TOTAL>=100",
+    )
+    check.add_argument("--thresholds-file", help="JSON阈值文件")
+    check.add_argument(
+        "--changed-files", help="变更文件列表（每行一个路径），供 @changed 使用"
+    )
+    check.add_argument(
+        "--statuses",
+        default="OPEN,CONFIRMED,REOPENED",
+        help="计入的状态 [OPEN,CONFIRMED,REOPENED]",
+    )
+    check.add_argument("--report", help="将JSON报告写入文件")
+    check.add_argument("--json", action="store_true", help="以JSON格式输出报告")
+
+    rank = subparsers.add_parser("rank", help="流式计算文件/规则/目录热点排行")
+    rank.add_argument("--branch", help="分支（默认为所有分支汇总）")
+    rank.add_argument("--pr", help="PR编号")
+    rank.add_argument("--severities", help="严重级别过滤，如 BLOCKER,CRITICAL")
+    rank.add_argument("--statuses", default="OPEN", help="状态过滤 [OPEN]")
+    rank.add_argument("--top-files", type=int, default=50, help="文件排行数量 [50]")
+    rank.add_argument("--top-rules", type=int, default=20, help="规则排行数量 [20]")
+    rank.add_argument("--top-dirs", type=int, default=20, help="目录排行数量 [20]")
+    rank.add_argument("--depth", type=int, default=2, help="目录汇总的最大层级 [2]")
+    rank.add_argument(
+        "--weights", help="严重级别权重覆盖，如 BLOCKER=20,INFO=0（默认10/5/3/1/0.5）"
+    )
+    rank.add_argument("--formats", default="xlsx,json", help="导出格式 [xlsx,json]")
+    rank.add_argument("--output", help="输出文件名（不含扩展名）")
+
+    soak = subparsers.add_parser(
+        "soak", help="soak测试：对本地假服务长时间运行完整流程并检测泄漏"
+    )
+    soak.add_argument("--issues", type=int, default=100000, help="数据集大小 [100000]")
+    soak.add_argument("--duration", type=float, default=600, help="运行时长（秒）[600]")
+    soak.add_argument(
+        "--iterations", type=int, default=0, help="最多运行轮数，0表示不限"
+    )
+    soak.add_argument("--warmup", type=int, default=2, help="预热轮数，不计入基线 [2]")
+    soak.add_argument(
+        "--latency", type=float, default=20, help="每页响应延迟（毫秒）[20]"
+    )
+    soak.add_argument("--jitter", type=float, default=10, help="延迟抖动（毫秒）[10]")
+    soak.add_argument(
+        "--error-rate", type=float, default=0.01, help="注入5xx错误的比例 [0.01]"
+    )
+    soak.add_argument(
+        "--formats",
+        default="csv,snap",
+        help="每轮导出的格式: xlsx,csv,json,snap [csv,snap]",
+    )
+    soak.add_argument(
+        "--max-rss-growth", type=float, default=50, help="允许的内存增长（MB）[50]"
+    )
+    soak.add_argument("--max-fd-growth", type=int, default=2, help="允许的句柄增长 [2]")
+    soak.add_argument(
+        "--max-throughput-drift",
+        type=float,
+        default=25,
+        help="允许的吞吐下降（%%）[25]",
+    )
+    soak.add_argument("--max-failures", type=int, default=0, help="允许的失败轮数 [0]")
+    soak.add_argument("--report", help="将JSON报告写入文件")
+
+    args = parser.parse_args(argv)
+
+    # 校验并转换 --set 覆盖值
+    args.overrides = {}
+    for item in args.set:
+        name, sep, value = item.partition("=")
+        name = name.strip()
+        if not sep or name in CONFIG_META_FIELDS:
+            parser.error(f"无效的配置覆盖: {item}")
+        try:
+            args.overrides[name] = coerce_config_value(name, value.strip())
+        except ValueError as e:
+            parser.error(f"无效的配置覆盖 {item}: {e}")
+
+    # 校验环境变量覆盖值，与 --set 一样在启动时报错
+    for field in dataclasses.fields(AppConfig):
+        env_name = config_env_name(field.name)
+        env_value = os.environ.get(env_name)
+        if field.name in CONFIG_META_FIELDS or not env_value:
+            continue
+        try:
+            coerce_config_value(field.name, env_value)
+        except ValueError as e:
+            parser.error(f"无效的环境变量 {env_name}={env_value}: {e}")
+
+    return args
+
+
 def main():
     """主函数"""
+    args = parse_args()
+    CONFIG_STORE.configure(args.config_profile, args.overrides)
+    if args.profile:
+        PROFILER.enable(args.profile_dir)
+    try:
+        run_command(args)
+    finally:
+        PROFILER.report(args.profile_top)
+
+
+def run_command(args):
+    """执行子命令；未指定子命令时进入交互式菜单"""
+    if args.command == "check":
+        sys.exit(run_check(get_config_or_prompt(), args))
+    if args.command == "rank":
+        sys.exit(run_rank_command(get_config_or_prompt(), args))
+    if args.command == "soak":
+        sys.exit(run_soak(args))
+    if args.command == "watch":
+        config = get_config_or_prompt()
+        run_watch(config, args)
+        return
+
     print("=" * 60)
     print(f"SonarCloud Issues v{CURRENT_VERSION}")
     print("支持多格式导出")
@@ -835,12 +3671,19 @@ def main():
                 print("提示：仅导出OPEN状态的issues")
 
             # 步骤3：选择导出范围
-            branch, pr_number = select_scope(config)
-            if branch is None and pr_number is None and choice != "4":
+            scope = select_scope(config)
+            if scope is None:
                 continue
+            branch, pr_number = scope
 
-            # 步骤4：获取数据
-            issues = fetch_all_issues(config, branch, pr_number, severities, statuses)
+            # 步骤4：获取数据（Ctrl+C取消进行中的请求并返回主菜单）
+            try:
+                issues = fetch_all_issues(
+                    config, branch, pr_number, severities, statuses
+                )
+            except KeyboardInterrupt:
+                print("\n提示：已取消获取")
+                continue
 
             if issues is None:
                 print("\n导出失败，请检查错误信息")
@@ -856,7 +3699,7 @@ def main():
                 print("5. 确认分支/PR是否存在")
                 print("6. 在浏览器测试此链接:")
                 print(
-                    f"   https://sonarcloud.io/api/issues/search?componentKeys={config['project_key']}&organization={config['organization']}&ps=10"
+                    f"   https://sonarcloud.io/api/issues/search?componentKeys={config.project_key}&organization={config.organization}&ps=10"
                 )
                 continue
 
@@ -866,49 +3709,21 @@ def main():
                 continue
 
             # 步骤6：执行导出
-            print("\n" + "=" * 60)
-            print("开始导出...")
-            print("=" * 60)
-
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            success = False
-
-            for choice in export_choices:
-                if choice == "1":
-                    filename = f"{OUTPUT_PREFIX}_{timestamp}.xlsx"
-                    print(f"\n[Excel] 导出: {filename}")
-                    if export_to_excel(issues, filename):
-                        print("    完成")
-                        success = True
-
-                elif choice == "2":
-                    filename = f"{OUTPUT_PREFIX}_{timestamp}.csv"
-                    print(f"\n[CSV] 导出: {filename}")
-                    if export_to_csv(issues, filename):
-                        print("    完成")
-                        success = True
-
-                elif choice == "3":
-                    filename = f"{OUTPUT_PREFIX}_{timestamp}.json"
-                    print(f"\n[JSON] 导出: {filename}")
-                    if export_to_json(issues, filename, config):
-                        print("    完成")
-                        success = True
-
-            # 最终报告
-            print("\n" + "=" * 60)
-            if success:
-                print("导出完成!")
-                print(f"文件保存在: {os.getcwd()}")
-            else:
-                print("导出失败，请检查错误信息")
-            print("=" * 60)
+            export_issues(issues, export_choices, config)
 
         elif choice == "2":
             show_settings_menu()
+        elif choice == "3":
+            export_from_snapshot(config)
+        elif choice == "4":
+            try:
+                rank_hotspots_interactive(config)
+            except KeyboardInterrupt:
+                print("\n提示：已取消")
         else:
             print("无效选项，请重新选择")
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # PyInstaller打包后多进程导出所需
     main()
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+import main
+
+
+def make_issue(index, severity="MAJOR", path=None):
+    return {
+        "key": f"K{index}",
+        "type": "BUG",
+        "severity": severity,
+        "status": "OPEN",
+        "component": f"proj:{path or f'src/file{index}.py'}",
+        "line": index,
+        "message": "msg",
+        "rule": "python:S1",
+    }
+
+
+class StubResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class StubClient:
+    """按issues/search的分页与facets语义返回固定数据，并记录请求"""
+
+    def __init__(self, issues, max_connections=8):
+        self.issues = issues
+        self.max_connections = max_connections
+        self.requests_sent = 0
+        self.pages = []
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        self.requests_sent += 1
+        severities = params.get("severities")
+        items = [
+            issue
+            for issue in self.issues
+            if not severities or issue["severity"] in severities.split(",")
+        ]
+        page, size = params["p"], params["ps"]
+        self.pages.append(page)
+        data = {"total": len(items), "issues": items[(page - 1) * size : page * size]}
+        if "facets" in params:
+            counts = {}
+            for issue in items:
+                counts[issue["severity"]] = counts.get(issue["severity"], 0) + 1
+                counts[issue["type"]] = counts.get(issue["type"], 0) + 1
+            data["facets"] = [
+                {"values": [{"val": v, "count": c} for v, c in counts.items()]}
+            ]
+        return StubResponse(data)
+
+
+def evaluate(client, expressions, changed_files=(), page_size=10):
+    config = main.AppConfig(
+        sonar_token="t", project_key="proj", organization="org", page_size=page_size
+    )
+    thresholds = [main.parse_threshold(e) for e in expressions]
+    requests_made = asyncio.run(
+        main.evaluate_thresholds(
+            client, config, thresholds, None, None, "OPEN", set(changed_files)
+        )
+    )
+    return thresholds, requests_made
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("BLOCKER>0", ("BLOCKER", None, ">", 0)),
+        ("critical@src/>20", ("CRITICAL", "src/", ">", 20)),
+        (" BUG@changed >= 1 ", ("BUG", "changed", ">=", 1)),
+        ("TOTAL>=100", ("TOTAL", None, ">=", 100)),
+    ],
+)
+def test_parse_threshold(expression, expected):
+    threshold = main.parse_threshold(expression)
+    assert (
+        threshold["selector"],
+        threshold["path"],
+        threshold["op"],
+        threshold["limit"],
+    ) == expected
+    assert threshold["count"] == 0 and threshold["bound"] is None
+
+
+@pytest.mark.parametrize("expression", ["BLOCKER", "BLOCKER<1", "FOO>1", "MAJOR>x"])
+def test_parse_threshold_rejects_invalid(expression):
+    with pytest.raises(ValueError):
+        main.parse_threshold(expression)
+
+
+def test_pathless_thresholds_use_facets_only():
+    client = StubClient([make_issue(i) for i in range(50)])
+    thresholds, requests_made = evaluate(client, ["MAJOR>10", "BLOCKER>0"])
+    assert requests_made == 1
+    assert [t["count"] for t in thresholds] == [50, 0]
+    assert all(t["bound"] is None for t in thresholds)
+
+
+def test_path_threshold_below_facet_count_needs_no_pages():
+    client = StubClient([make_issue(i) for i in range(5)])
+    thresholds, requests_made = evaluate(client, ["MAJOR@src/>10"])
+    assert requests_made == 1
+    assert (thresholds[0]["count"], thresholds[0]["bound"]) == (5, "upper")
+
+
+def test_violation_stops_without_prefetching():
+    client = StubClient([make_issue(i) for i in range(200)])
+    thresholds, requests_made = evaluate(client, ["MAJOR@src/>10"])
+    # facets请求 + 第1、2页（第2页累计到20条时超标）
+    assert client.pages == [1, 1, 2]
+    assert requests_made == client.requests_sent == 3
+    assert thresholds[0]["count"] == 20 and thresholds[0]["bound"] == "lower"
+
+
+def test_pass_decided_once_remaining_cannot_exceed():
+    issues = [make_issue(i, path="other.py") for i in range(25)]
+    issues += [make_issue(100 + i, path="src/a.py") for i in range(3)]
+    client = StubClient(issues)
+    thresholds, requests_made = evaluate(client, ["MAJOR@changed>5"], ["src/a.py"])
+    # 3页取完才能确定：前两页没有命中，但剩余数量仍可能超标
+    assert requests_made == 4
+    assert thresholds[0]["count"] == 3
+    assert not main.threshold_violated(thresholds[0], thresholds[0]["count"])
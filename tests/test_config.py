@@ -0,0 +1,160 @@
+import dataclasses
+import json
+
+import pytest
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for field in dataclasses.fields(main.AppConfig):
+        monkeypatch.delenv(main.config_env_name(field.name), raising=False)
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    return tmp_path / ".sonarcloud_config.json"
+
+
+def write_document(path, profiles, active="default"):
+    path.write_text(
+        json.dumps({"active_profile": active, "profiles": profiles}), encoding="utf-8"
+    )
+
+
+def test_precedence_file_env_cli(config_path, monkeypatch):
+    write_document(
+        config_path,
+        {"default": {"project_key": "file", "branch": "dev", "page_size": 100}},
+    )
+    monkeypatch.setenv("SONAR_PROJECT_KEY", "env")
+    monkeypatch.setenv("SONAR_PAGE_SIZE", "200")
+    store = main.ConfigStore(str(config_path))
+    store.configure(cli_overrides={"page_size": 300})
+
+    config = store.load()
+    assert config.branch == "dev"  # 仅配置文件
+    assert config.project_key == "env"  # 环境变量覆盖配置文件
+    assert config.page_size == 300  # 命令行覆盖环境变量
+    assert store.overrides() == {"project_key": "env", "page_size": 300}
+
+
+def test_overrides_are_not_written_back(config_path, monkeypatch):
+    write_document(config_path, {"default": {"project_key": "file"}})
+    monkeypatch.setenv("SONAR_PROJECT_KEY", "env")
+    store = main.ConfigStore(str(config_path))
+    store.save({"branch": "release"})
+
+    stored = json.loads(config_path.read_text(encoding="utf-8"))
+    assert stored["profiles"]["default"] == {
+        "project_key": "file",
+        "branch": "release",
+    }
+    assert store.load().project_key == "env"
+
+
+def test_profile_selection_and_switch(config_path):
+    write_document(
+        config_path,
+        {"default": {"project_key": "a"}, "ci": {"project_key": "b"}},
+        active="ci",
+    )
+    store = main.ConfigStore(str(config_path))
+    assert store.load().project_key == "b"
+
+    config = store.load()
+    store.switch_profile("default")
+    assert config.project_key == "a"  # 原地刷新已持有的对象
+    stored = json.loads(config_path.read_text(encoding="utf-8"))
+    assert stored["active_profile"] == "default"
+
+    explicit = main.ConfigStore(str(config_path))
+    explicit.configure(profile="ci")
+    assert explicit.load().project_key == "b"
+
+
+def test_legacy_flat_file_becomes_default_profile(config_path):
+    config_path.write_text(
+        json.dumps({"sonar_token": "t", "project_key": "p", "organization": "o"}),
+        encoding="utf-8",
+    )
+    store = main.ConfigStore(str(config_path))
+    assert store.profiles() == ["default"]
+    assert store.load().is_complete()
+
+    store.save({"branch": "dev"})
+    stored = json.loads(config_path.read_text(encoding="utf-8"))
+    assert stored["profiles"]["default"]["project_key"] == "p"
+    assert stored["profiles"]["default"]["branch"] == "dev"
+
+
+def test_invalid_file_values_fall_back_to_defaults(config_path, capsys):
+    write_document(
+        config_path, {"default": {"page_size": 0, "unknown": 1, "branch": "dev"}}
+    )
+    config = main.ConfigStore(str(config_path)).load()
+    assert config.page_size == main.AppConfig().page_size
+    assert config.branch == "dev"
+    assert "page_size" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("SONAR_PAGE_SIZE", "abc"),
+        ("SONAR_PAGE_SIZE", "0"),
+        ("SONAR_PAGE_SIZE", "501"),
+        ("SONAR_MAX_CONNECTIONS", "0"),
+        ("SONAR_MAX_RETRIES", "-1"),
+        ("SONAR_RETRY_BACKOFF", "0"),
+        ("SONAR_OUTPUT_NAMING", "random"),
+    ],
+)
+def test_invalid_env_values_are_rejected(monkeypatch, name, value):
+    monkeypatch.setenv(name, value)
+    with pytest.raises(SystemExit):
+        main.parse_args(["check"])
+
+
+@pytest.mark.parametrize("item", ["page_size=0", "nosuch=1", "created_at=x", "branch"])
+def test_invalid_set_values_are_rejected(item):
+    with pytest.raises(SystemExit):
+        main.parse_args(["--set", item, "check"])
+
+
+def test_valid_overrides_are_coerced():
+    args = main.parse_args(["--set", "page_size=200", "--set", "retry_backoff=0.5"])
+    assert args.overrides == {"page_size": 200, "retry_backoff": 0.5}
+
+
+def test_corrupt_file_is_backed_up_and_can_be_saved(config_path, capsys):
+    config_path.write_text("{bad", encoding="utf-8")
+    store = main.ConfigStore(str(config_path))
+    assert store.load() is None
+    assert "已损坏" in capsys.readouterr().out
+
+    store.save({"sonar_token": "t", "project_key": "p", "organization": "o"})
+    assert store.load().is_complete()
+    stored = json.loads(config_path.read_text(encoding="utf-8"))
+    assert stored["profiles"]["default"]["project_key"] == "p"
+    assert (config_path.parent / (config_path.name + ".bak")).read_text() == "{bad"
+
+
+def test_replace_refreshes_cached_config(config_path):
+    write_document(
+        config_path,
+        {
+            "default": {
+                "project_key": "p",
+                "max_connections": 16,
+                "output_naming": "hash",
+            }
+        },
+    )
+    store = main.ConfigStore(str(config_path))
+    config = store.load()
+    store.save({"project_key": "q"}, replace=True)
+    assert config.project_key == "q"
+    assert config.max_connections == main.AppConfig().max_connections
+    assert config.output_naming == main.AppConfig().output_naming
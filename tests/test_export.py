@@ -0,0 +1,173 @@
+import datetime
+import json
+import os
+
+import pytest
+
+import main
+
+
+def make_rows(count):
+    return [
+        {
+            "Issue Key": f"K{index}",
+            "类型": "BUG",
+            "严重级别": main.SEVERITY_LEVELS[index % 5],
+            "状态": "OPEN",
+            "文件路径": f"src/模块{index % 7}/file{index}.py",
+            "行号": index,
+            "问题描述": f'含逗号, "引号"与换行\n的描述 {index}',
+            "创建时间": "2025-01-01T00:00:00+0000",
+            "作者": "dev@example.com",
+            "规则": f"S{index % 11}",
+            "分支": "main",
+            "PR编号": "N/A",
+        }
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def use_config(monkeypatch):
+    def apply(**values):
+        monkeypatch.setattr(main.CONFIG_STORE, "_config", main.AppConfig(**values))
+
+    return apply
+
+
+def test_parallel_csv_is_byte_identical(tmp_path, use_config):
+    rows = make_rows(250)
+    use_config(parallel_export_rows=10**9)
+    assert main.export_to_csv(rows, str(tmp_path / "serial.csv"))
+
+    use_config(parallel_export_rows=10, export_workers=3)
+    assert main.use_parallel_export(rows)
+    main.PARALLEL_CHUNK_ROWS, saved = 40, main.PARALLEL_CHUNK_ROWS
+    try:
+        assert main.export_to_csv(rows, str(tmp_path / "parallel.csv"))
+    finally:
+        main.PARALLEL_CHUNK_ROWS = saved
+
+    serial = (tmp_path / "serial.csv").read_bytes()
+    assert serial == (tmp_path / "parallel.csv").read_bytes()
+    assert serial == main.render_csv_bytes(rows)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 5])
+def test_excel_parts_depend_only_on_row_count(tmp_path, use_config, workers):
+    use_config(excel_part_rows=10, export_workers=workers)
+    filename = tmp_path / "issues.xlsx"
+    assert main.export_to_excel(make_rows(25), str(filename))
+
+    manifest = json.loads((tmp_path / "issues_manifest.json").read_text("utf-8"))
+    assert [(p["file"], p["rows"]) for p in manifest["parts"]] == [
+        ("issues_part001.xlsx", 10),
+        ("issues_part002.xlsx", 10),
+        ("issues_part003.xlsx", 5),
+    ]
+    assert not filename.exists()
+
+
+def test_excel_below_part_rows_is_single_file(tmp_path, use_config):
+    use_config(excel_part_rows=10, export_workers=4)
+    assert main.excel_part_count(make_rows(10)) == 1
+    assert main.export_to_excel(make_rows(10), str(tmp_path / "issues.xlsx"))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["issues.xlsx"]
+
+
+class FakeClock:
+    """每次调用now()前进一秒，使timestamp模式的文件名互不相同"""
+
+    def __init__(self):
+        self.current = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+    def now(self):
+        self.current += datetime.timedelta(seconds=1)
+        return self.current
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    clock = FakeClock()
+    monkeypatch.setattr(
+        main, "datetime", type("datetime", (main.datetime,), {"now": clock.now})
+    )
+    return tmp_path
+
+
+def export_json(rows, **values):
+    config = main.AppConfig(project_key="proj", organization="org", **values)
+    assert main.export_issues(rows, ["3"], config)
+    with open(main.EXPORT_STATE_FILE, encoding="utf-8") as f:
+        return json.load(f)["json"]
+
+
+def mark_file(path):
+    path.write_text("marker", encoding="utf-8")
+
+
+def test_hash_mode_skips_existing_file(workdir):
+    rows = make_rows(5)
+    first = export_json(rows, output_naming="hash")
+    target = workdir / first["file"]
+    assert target.name.startswith(f"{main.OUTPUT_PREFIX}_{first['hash'][:16]}")
+    mark_file(target)
+
+    assert export_json(rows, output_naming="hash") == first
+    assert target.read_text(encoding="utf-8") == "marker"
+
+
+def test_fixed_mode_skips_only_when_stored_file_is_target(workdir):
+    rows = make_rows(5)
+    timestamped = export_json(rows)
+    target = workdir / f"{main.OUTPUT_PREFIX}.json"
+    assert not target.exists()
+
+    # 内容相同但记录的是其他文件：仍需写入固定文件名
+    fixed = export_json(rows, output_naming="fixed")
+    assert fixed == {"file": target.name, "hash": timestamped["hash"]}
+    mark_file(target)
+
+    export_json(rows, output_naming="fixed")
+    assert target.read_text(encoding="utf-8") == "marker"
+
+
+def test_timestamp_symlink_points_to_previous_file(workdir):
+    rows = make_rows(5)
+    first = export_json(rows, unchanged_action="symlink")
+    second = export_json(rows, unchanged_action="symlink")
+    assert second == first  # 记录仍指向原始文件
+
+    links = [p for p in workdir.glob(f"{main.OUTPUT_PREFIX}_*.json") if p.is_symlink()]
+    assert len(links) == 1
+    assert os.readlink(links[0]) == first["file"]
+
+
+def test_timestamp_skip_writes_nothing(workdir):
+    rows = make_rows(5)
+    export_json(rows, unchanged_action="skip")
+    export_json(rows, unchanged_action="skip")
+    assert len(list(workdir.glob(f"{main.OUTPUT_PREFIX}_*.json"))) == 1
+
+
+@pytest.mark.parametrize("naming", ["timestamp", "hash", "fixed"])
+def test_changed_content_writes_new_file(workdir, naming):
+    first = export_json(make_rows(5), output_naming=naming, unchanged_action="skip")
+    second = export_json(make_rows(6), output_naming=naming, unchanged_action="skip")
+    assert second["hash"] != first["hash"]
+    data = json.loads((workdir / second["file"]).read_text(encoding="utf-8"))
+    assert data["metadata"]["total_issues"] == 6
+
+
+def test_content_hash_ignores_input_order():
+    config = main.AppConfig(project_key="proj", organization="org")
+    rows = make_rows(30)
+    shuffled = rows[::-1][10:] + rows[::-1][:10]
+    assert main.compute_content_hash(
+        main.sort_issues(rows), config
+    ) == main.compute_content_hash(main.sort_issues(shuffled), config)
+    other = main.AppConfig(project_key="other", organization="org")
+    assert main.compute_content_hash(
+        main.sort_issues(rows), config
+    ) != main.compute_content_hash(main.sort_issues(rows), other)
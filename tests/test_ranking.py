@@ -0,0 +1,58 @@
+import random
+
+import main
+
+
+def test_count_min_sketch_never_underestimates():
+    sketch = main.CountMinSketch(width=64, depth=4)
+    exact = {}
+    rng = random.Random(1)
+    for _ in range(2000):
+        key = f"k{rng.randrange(500)}"
+        sketch.add(key, 2.0)
+        exact[key] = exact.get(key, 0) + 2.0
+    assert all(sketch.estimate(key) >= count for key, count in exact.items())
+
+
+def test_topk_keeps_heaviest_keys():
+    tracker = main.TopKTracker(3)
+    for key, weight in [("a", 1), ("b", 5), ("c", 3), ("d", 4), ("a", 1)]:
+        tracker.add(key, weight)
+    assert [key for key, _, _ in tracker.top()] == ["b", "d", "c"]
+
+
+def test_topk_evicts_when_key_overtakes():
+    tracker = main.TopKTracker(2)
+    tracker.add("a", 5)
+    tracker.add("b", 4)
+    tracker.add("c", 1)  # 低于堆顶，不进入候选
+    assert {key for key, _, _ in tracker.top()} == {"a", "b"}
+    for _ in range(5):
+        tracker.add("c", 1)
+    assert [(key, score) for key, score, _ in tracker.top()] == [("c", 6), ("a", 5)]
+
+
+def test_topk_counts_and_ties():
+    tracker = main.TopKTracker(2)
+    tracker.add("y", 2, count=1)
+    tracker.add("x", 1, count=1)
+    tracker.add("x", 1, count=1)
+    # 得分相同时按key排序
+    assert tracker.top() == [("x", 2, 2), ("y", 2, 1)]
+
+
+def test_topk_heap_stays_bounded():
+    tracker = main.TopKTracker(5)
+    rng = random.Random(2)
+    for _ in range(5000):
+        tracker.add(f"k{rng.randrange(50)}", rng.random())
+    assert len(tracker.top()) == 5
+    assert len(tracker._heap) <= 4 * tracker.k
+    scores = [score for _, score, _ in tracker.top()]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_topk_with_zero_k():
+    tracker = main.TopKTracker(0)
+    tracker.add("a", 1)
+    assert tracker.top() == []
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import main
+
+
+def make_row(key, path, line, severity="MAJOR", issue_type="BUG", rule="S1"):
+    return {
+        "Issue Key": key,
+        "类型": issue_type,
+        "严重级别": severity,
+        "状态": "OPEN",
+        "文件路径": path,
+        "行号": line,
+        "问题描述": f"问题 {key}",
+        "创建时间": "2025-01-01T00:00:00+0000",
+        "作者": "dev@example.com",
+        "规则": rule,
+        "分支": "main",
+        "PR编号": "N/A",
+    }
+
+
+ROWS = [
+    make_row("K1", "src/b.py", 10),
+    make_row("K2", "src/b.py", 9, severity="BLOCKER"),
+    make_row("K3", "src/a.py", 1, issue_type="CODE_SMELL", rule="S2"),
+    make_row("K4", "src/ab/c.py", "", severity="MINOR"),
+    make_row("K5", "test/x.py", 3),
+    make_row("K0", "src/b.py", 9),
+]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    filename = tmp_path / "issues.snap"
+    main.write_snapshot(ROWS, str(filename), {"target": "main"})
+    with main.IssueSnapshot(str(filename)) as snapshot:
+        yield snapshot
+
+
+def test_round_trip(snapshot):
+    assert len(snapshot) == len(ROWS)
+    assert snapshot.metadata == {"target": "main"}
+    rows = snapshot.rows_for(snapshot.filter())
+    assert sorted(rows, key=lambda r: r["Issue Key"]) == sorted(
+        ROWS, key=lambda r: r["Issue Key"]
+    )
+
+
+def test_path_index_matches_sort_issues(snapshot):
+    rows = snapshot.rows_for(snapshot.filter())
+    assert [r["Issue Key"] for r in rows] == [
+        r["Issue Key"] for r in main.sort_issues(ROWS)
+    ]
+
+
+@pytest.mark.parametrize(
+    "prefix, expected",
+    [
+        ("src/", {"K0", "K1", "K2", "K3", "K4"}),
+        ("src/a", {"K3", "K4"}),
+        ("src/b.py", {"K0", "K1", "K2"}),
+        ("test/", {"K5"}),
+        ("zzz", set()),
+        ("a", set()),
+    ],
+)
+def test_path_prefix(snapshot, prefix, expected):
+    rows = snapshot.rows_for(snapshot.filter(path_prefix=prefix))
+    assert {r["Issue Key"] for r in rows} == expected
+
+
+def test_combined_filters(snapshot):
+    selected = snapshot.filter(
+        severities={"MAJOR", "BLOCKER"}, types={"BUG"}, path_prefix="src/"
+    )
+    assert isinstance(selected, np.ndarray)
+    rows = snapshot.rows_for(selected)
+    assert [r["Issue Key"] for r in rows] == ["K0", "K2", "K1"]
+    assert not len(snapshot.filter(rules={"S9"}))
+
+
+@pytest.mark.parametrize(
+    "content", [b"", b"not a snapshot at all", b"SCISNAP1\x10\x00\x00\x00{bad"]
+)
+def test_invalid_files_raise_value_error(tmp_path, content):
+    filename = tmp_path / "bad.snap"
+    filename.write_bytes(content)
+    with pytest.raises(ValueError):
+        main.IssueSnapshot(str(filename))
@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import json
+import os
+import sys
+
+import pytest
+
+import main
+
+NEW_EXE = b"new version " * 1000
+EXE_NAME = "sonarcloud_issues-v2.0.0-win.exe"
+
+
+class StubResponse:
+    def __init__(self, status_code=200, body=b"", headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.text = body.decode("utf-8", "replace")
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class StubClient:
+    """按URL返回预置响应，记录请求头"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append((url, headers))
+        route = self.routes.get(url)
+        return route(headers) if callable(route) else route or StubResponse(404)
+
+    async def download(self, url, dest_path, on_progress=None, timeout=120):
+        self.requests.append((url, None))
+        response = self.routes.get(url) or StubResponse(404)
+        if response.status_code == 200:
+            with open(dest_path, "wb") as f:
+                f.write(response.content)
+        return response
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    stub = StubClient({})
+
+    def run_with_client(config, func, *args, **kwargs):
+        return asyncio.run(func(stub, *args, **kwargs))
+
+    monkeypatch.setattr(main, "run_with_client", run_with_client)
+    return stub
+
+
+@pytest.fixture
+def config():
+    return main.AppConfig(update_mirror="http://mirror.test", update_cache_ttl=3600)
+
+
+def release(digest=None):
+    asset = {"name": EXE_NAME, "browser_download_url": None, "digest": digest}
+    return {"tag_name": "v2.0.0", "assets": [asset]}
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def metadata_route(body, etag='"v1"'):
+    def route(headers):
+        if headers and headers.get("If-None-Match") == etag:
+            return StubResponse(304)
+        return StubResponse(200, json.dumps(body).encode(), {"etag": etag})
+
+    return route
+
+
+def test_release_is_cached_within_ttl(client, config):
+    client.routes["http://mirror.test/latest.json"] = metadata_route(release())
+    assert main.get_latest_release(config)["tag_name"] == "v2.0.0"
+    assert main.get_latest_release(config)["tag_name"] == "v2.0.0"
+    assert len(client.requests) == 1
+
+
+def test_expired_cache_sends_etag_and_reuses_on_304(client, config):
+    config.update_cache_ttl = 0
+    client.routes["http://mirror.test/latest.json"] = metadata_route(release())
+    main.get_latest_release(config)
+    assert main.get_latest_release(config)["tag_name"] == "v2.0.0"
+    assert client.requests[0][1] is None
+    assert client.requests[1][1] == {"If-None-Match": '"v1"'}
+    with open(main.UPDATE_CACHE_FILE, encoding="utf-8") as f:
+        assert json.load(f)["etag"] == '"v1"'
+
+
+def test_changed_release_replaces_cache(client, config):
+    config.update_cache_ttl = 0
+    url = "http://mirror.test/latest.json"
+    client.routes[url] = metadata_route(release())
+    main.get_latest_release(config)
+    client.routes[url] = metadata_route(dict(release(), tag_name="v3.0.0"), etag='"v2"')
+    assert main.get_latest_release(config)["tag_name"] == "v3.0.0"
+
+
+def test_cache_for_other_url_and_bypass_are_ignored(client, config):
+    client.routes["http://mirror.test/latest.json"] = metadata_route(release())
+    main.get_latest_release(config)
+    main.get_latest_release(config, use_cache=False)
+    other = main.AppConfig(update_mirror="http://other.test")
+    client.routes["http://other.test/latest.json"] = metadata_route(release())
+    main.get_latest_release(other)
+    assert len(client.requests) == 3
+
+
+def test_http_error_returns_none(client, config):
+    client.routes["http://mirror.test/latest.json"] = StubResponse(500)
+    assert main.get_latest_release(config) is None
+
+
+def test_expected_sha256_prefers_digest(client, config):
+    digest = sha256(NEW_EXE)
+    client.routes[f"http://mirror.test/v2.0.0/{EXE_NAME}.sha256"] = StubResponse(
+        200, b"0" * 64
+    )
+    assert (
+        main.expected_sha256(config, release("sha256:" + digest), "v2.0.0", EXE_NAME)
+        == digest
+    )
+    assert client.requests == []
+
+
+def test_expected_sha256_falls_back_to_sidecar(client, config):
+    digest = sha256(NEW_EXE)
+    client.routes[f"http://mirror.test/v2.0.0/{EXE_NAME}.sha256"] = StubResponse(
+        200, f"{digest.upper()}  {EXE_NAME}\n".encode()
+    )
+    assert main.expected_sha256(config, release(), "v2.0.0", EXE_NAME) == digest
+
+
+@pytest.mark.parametrize("response", [StubResponse(404), StubResponse(200, b"junk")])
+def test_expected_sha256_missing(client, config, response):
+    client.routes[f"http://mirror.test/v2.0.0/{EXE_NAME}.sha256"] = response
+    assert main.expected_sha256(config, release(), "v2.0.0", EXE_NAME) is None
+
+
+def test_download_release_verifies_hash(client, config, tmp_path):
+    client.routes[f"http://mirror.test/v2.0.0/{EXE_NAME}"] = StubResponse(200, NEW_EXE)
+    dest = str(tmp_path / "new.exe")
+    good = release("sha256:" + sha256(NEW_EXE))
+    assert main.download_release(config, good, "v2.0.0", dest)
+    with open(dest, "rb") as f:
+        assert f.read() == NEW_EXE
+
+
+def test_download_release_rejects_mismatch(client, config, tmp_path):
+    client.routes[f"http://mirror.test/v2.0.0/{EXE_NAME}"] = StubResponse(200, NEW_EXE)
+    dest = str(tmp_path / "new.exe")
+    bad = release("sha256:" + sha256(b"something else"))
+    assert not main.download_release(config, bad, "v2.0.0", dest)
+    assert not os.path.exists(dest)
+
+
+def test_delta_update_applies_verified_patch(client, config, tmp_path, monkeypatch):
+    bsdiff4 = pytest.importorskip("bsdiff4")
+    old_exe = tmp_path / "sonarcloud_issues.exe"
+    old_exe.write_bytes(b"old version " * 1000)
+    monkeypatch.setattr(sys, "frozen", True, raising=False)
+    monkeypatch.setattr(sys, "executable", str(old_exe))
+
+    patch_name = f"sonarcloud_issues-{main.CURRENT_VERSION}-to-v2.0.0-win.patch"
+    patch = bsdiff4.diff(old_exe.read_bytes(), NEW_EXE)
+    client.routes[f"http://mirror.test/v2.0.0/{patch_name}"] = StubResponse(200, patch)
+    data = release("sha256:" + sha256(NEW_EXE))
+    data["assets"].append({"name": patch_name, "digest": "sha256:" + sha256(patch)})
+
+    dest = str(tmp_path / "new.exe")
+    assert main.download_release(config, data, "v2.0.0", dest)
+    with open(dest, "rb") as f:
+        assert f.read() == NEW_EXE
+    # 只下载了补丁，没有下载完整安装包
+    assert [url for url, _ in client.requests] == [
+        f"http://mirror.test/v2.0.0/{patch_name}"
+    ]
@@ -0,0 +1,78 @@
+import asyncio
+
+import main
+
+
+class StubResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class StubClient:
+    """按更新时间倒序返回issues"""
+
+    def __init__(self, issues):
+        self.issues = sorted(issues, key=lambda i: i["updateDate"], reverse=True)
+        self.pages = []
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        assert params["s"] == "UPDATE_DATE" and params["asc"] == "false"
+        assert "statuses" not in params
+        page, size = params["p"], params["ps"]
+        self.pages.append(page)
+        return StubResponse(
+            {
+                "total": len(self.issues),
+                "issues": self.issues[(page - 1) * size : page * size],
+            }
+        )
+
+
+def make_issue(key, updated, status="OPEN"):
+    return {
+        "key": key,
+        "type": "BUG",
+        "severity": "MAJOR",
+        "status": status,
+        "component": "proj:src/a.py",
+        "line": 1,
+        "updateDate": updated,
+    }
+
+
+def fetch_updates(issues, since, page_size=2):
+    client = StubClient(issues)
+    config = main.AppConfig(project_key="proj", organization="org", page_size=page_size)
+    updates = asyncio.run(main.fetch_issue_updates(client, config, "main", None, since))
+    return [row["Issue Key"] for row in updates], client.pages
+
+
+def test_updates_include_watermark_second():
+    issues = [
+        make_issue("old", "2025-01-01T00:00:00+0000"),
+        make_issue("same", "2025-01-02T00:00:00+0000"),
+        make_issue("new", "2025-01-03T00:00:00+0000"),
+        make_issue("newer", "2025-01-04T00:00:00+0000", status="CLOSED"),
+    ]
+    keys, pages = fetch_updates(issues, "2025-01-02T00:00:00+0000")
+    assert keys == ["newer", "new", "same"]
+    assert pages == [1, 2]  # 第2页遇到更早的记录即停止
+
+
+def test_updates_compare_timezones():
+    issues = [make_issue("k", "2025-01-02T09:00:00+0800")]
+    assert fetch_updates(issues, "2025-01-02T01:00:01+0000")[0] == []
+    assert fetch_updates(issues, "2025-01-02T01:00:00+0000")[0] == ["k"]
+
+
+def test_matches_issue_filter():
+    row = main.convert_issue(make_issue("k", "2025-01-01T00:00:00+0000", "CLOSED"))
+    assert not main.matches_issue_filter(row, None, "OPEN,REOPENED")
+    assert main.matches_issue_filter(row, "MAJOR", "CLOSED")
+    assert not main.matches_issue_filter(row, "BLOCKER", None)